@@ -1,24 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.reddit_scraper import RedditScraper
 from app.models.post import Post
-from app.db import SessionLocal
-from app.utils.text_cleaning import clean_story, word_count
-from app.video.generator import generate_video_from_text
+from app.models.video_job import VideoJob
+from app.db import AsyncSessionLocal, get_async_db, insert_ignore_duplicates
+from app.utils.text_cleaning import word_count
+from app.video.paths import BASE_VIDEOS
+from app.services.video_jobs import video_job_queue
 from typing import Optional
-from pydantic import BaseModel
-import uuid
+from pydantic import BaseModel, ConfigDict
+import secrets
 from pathlib import Path
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 DEFAULT_SUBREDDIT = "AmItheAsshole"
 EXAMPLE_SUBREDDITS = [
     "AmItheAsshole",
@@ -47,68 +45,92 @@ class VideoRequest(BaseModel):
     base_video: Optional[str] = "minecraft_parkour_base.mp4"
     voice_type: Optional[str] = "male"
 
+class PostOut(BaseModel):
+    """Post summary returned by list endpoints"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    score: int
+    subreddit: str
+    word_count: int
+
+def _eligible_rows(posts: list, min_score: int, min_words: int) -> list:
+    """Keep scraped posts long and popular enough to store (stories arrive cleaned)"""
+    rows = []
+    for p in posts:
+        if p["score"] >= min_score and p["story"]:
+            story_words = word_count(p["story"])
+            if story_words < min_words:
+                continue
+            rows.append({
+                **p,
+                "word_count": story_words,
+                "title_word_count": word_count(p["title"] or "")
+            })
+    return rows
+
 @router.post("/scrape/")
-def scrape_and_store(
+async def scrape_and_store(
     req: ScrapeRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     subreddit = req.subreddit or DEFAULT_SUBREDDIT
     min_score = req.min_score or 500
     stored_posts = []
     min_words = 150  # ~1 minute at 2.5 words/sec
     scraper = RedditScraper(subreddit)
-    posts = scraper.fetch_top_posts()
-    for p in posts:
-        if p["score"] >= min_score and p["story"]:
-            cleaned_story = clean_story(p["story"])
-            if word_count(cleaned_story) < min_words:
-                continue
-            exists = db.query(Post).filter_by(reddit_id=p["reddit_id"]).first()
-            if not exists:
-                post_obj = Post(**{**p, "story": cleaned_story})
-                db.add(post_obj)
-                db.flush()  # Assigns an ID
-                post_dict = post_obj.__dict__.copy()
-                post_dict["story"] = cleaned_story
-                post_dict.pop('_sa_instance_state', None)
-                stored_posts.append(post_dict)
-    db.commit()
+    posts = await run_in_threadpool(scraper.fetch_top_posts)
+    rows = _eligible_rows(posts, min_score, min_words)
+
+    # Single atomic insert; posts already stored are skipped by the unique index
+    if rows:
+        stmt = insert_ignore_duplicates(Post, rows, ["reddit_id"])
+        result = await db.execute(stmt.returning(*Post.__table__.c))
+        stored_posts = [dict(row._mapping) for row in result]
+    await db.commit()
     return {"stored": len(stored_posts), "posts": stored_posts}
 
-@router.get("/posts/")
-def get_posts(
+@router.get("/posts/", response_model=list[PostOut])
+async def get_posts(
     subreddit: Optional[str] = None,
-    min_score: int = 500,
-    db: Session = Depends(get_db)
+    min_score: int = 500
 ):
-    q = db.query(Post)
-    if subreddit:
-        q = q.filter(Post.subreddit == subreddit)
-    posts = q.filter(Post.score >= min_score).order_by(Post.score.desc()).all()
-    result = []
     min_words = 150
-    for post in posts:
-        cleaned = clean_story(post.story)
-        if word_count(cleaned) >= min_words:
-            post_dict = post.__dict__.copy()
-            post_dict["story"] = cleaned
-            post_dict.pop('_sa_instance_state', None)
-            result.append(post_dict)
-    return result
+    q = select(Post.id, Post.title, Post.score, Post.subreddit, Post.word_count)
+    if subreddit:
+        q = q.where(Post.subreddit == subreddit)
+    q = q.where(Post.score >= min_score, Post.word_count >= min_words).order_by(Post.score.desc())
+
+    async def stream_posts():
+        # Own session: the response body is produced after the handler returns
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(q.execution_options(yield_per=500))
+            yield b'['
+            first = True
+            async for row in result:
+                if not first:
+                    yield b','
+                first = False
+                # StreamingResponse bypasses response_model, so validate here
+                yield PostOut.model_validate(row).model_dump_json().encode()
+            yield b']'
+
+    return StreamingResponse(stream_posts(), media_type="application/json")
 
 @router.delete("/posts/")
-def delete_all_posts(db: Session = Depends(get_db)):
-    num_deleted = db.query(Post).delete()
-    db.commit()
-    return {"deleted": num_deleted}
+async def delete_all_posts(db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(delete(Post))
+    await db.commit()
+    return {"deleted": result.rowcount}
 
 
 @router.get("/counts/")
-def get_counts(
+async def get_counts(
     subreddit: Optional[str] = None,
     min_score: int = 500,
     min_words: int = 150,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Return counts of posts grouped by subreddit with optional filters.
 
@@ -117,39 +139,31 @@ def get_counts(
     - min_score: minimum score to include
     - min_words: minimum cleaned-word-count to include
     """
-    q = db.query(Post)
+    q = select(Post.subreddit, func.count())
     if subreddit:
-        q = q.filter(Post.subreddit == subreddit)
-    q = q.filter(Post.score >= min_score)
-    posts = q.all()
-
-    by_sub = {}
-    total = 0
-    for post in posts:
-        cleaned = clean_story(post.story)
-        if word_count(cleaned) < min_words:
-            continue
-        total += 1
-        by_sub[post.subreddit] = by_sub.get(post.subreddit, 0) + 1
+        q = q.where(Post.subreddit == subreddit)
+    q = q.where(Post.score >= min_score, Post.word_count >= min_words).group_by(Post.subreddit)
+    rows = (await db.execute(q)).all()
 
-    return {"total": total, "by_subreddit": by_sub}
+    by_sub = {sub: count for sub, count in rows}
+    return {"total": sum(by_sub.values()), "by_subreddit": by_sub}
 
 
 @router.post("/video/")
-def generate_video(
+async def generate_video(
     req: VideoRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate a video from a reddit post or raw text."""
     if not req.post_id and not req.raw_text:
         raise HTTPException(status_code=400, detail="Either post_id or raw_text must be provided")
     
     if req.post_id:
-        post = db.query(Post).filter(Post.id == req.post_id).first()
+        post = await db.get(Post, req.post_id)
         if not post:
             raise HTTPException(status_code=404, detail="Post not found")
-        text = clean_story(post.story)
-        if word_count(text) < 150:
+        text = post.story
+        if (post.word_count or 0) < 150:
             raise HTTPException(status_code=400, detail="Story too short for video generation")
         story_title = post.title
         subreddit = post.subreddit
@@ -158,81 +172,109 @@ def generate_video(
         story_title = None
         subreddit = None
     
-    job_id = str(uuid.uuid4())
+    if not (BASE_VIDEOS / req.base_video).exists():
+        raise HTTPException(status_code=404, detail=f"Base video not found: {req.base_video}")
     
-    try:
-        video_path = generate_video_from_text(
-            text, 
-            req.base_video, 
-            job_id, 
-            req.voice_type,
-            story_title=story_title,
-            subreddit=subreddit
-        )
-        return {
-            "job_id": job_id,
-            "status": "completed",
-            "video_path": video_path,
-            "message": "Video generated successfully with YouTube Shorts metadata"
-        }
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Video generation failed: {str(e)}")
+    job_id = secrets.token_hex(16)
+    await run_in_threadpool(
+        video_job_queue.enqueue,
+        job_id,
+        text,
+        req.base_video,
+        req.voice_type,
+        story_title=story_title,
+        subreddit=subreddit,
+        post_id=req.post_id
+    )
+    return {
+        "job_id": job_id,
+        "status": "pending",
+        "message": "Video generation queued - poll /video/status/{job_id} for progress"
+    }
 
 
 @router.get("/video/highest-score/")
-def generate_video_from_highest_score(
+async def generate_video_from_highest_score(
     base_video: str = "minecraft_parkour_base.mp4",
     voice_type: str = "male",
     min_words: int = 150,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate a video from the highest scoring reddit post."""
-    post = db.query(Post).filter(Post.score >= 500).order_by(Post.score.desc()).first()
+    result = await db.execute(
+        select(Post)
+        .where(Post.score >= 500, Post.word_count >= min_words)
+        .order_by(Post.score.desc())
+        .limit(1)
+    )
+    post = result.scalar_one_or_none()
     if not post:
         raise HTTPException(status_code=404, detail="No high-scoring posts found")
     
-    text = clean_story(post.story)
-    if word_count(text) < min_words:
-        raise HTTPException(status_code=400, detail="Highest scoring story too short for video generation")
+    text = post.story
     
-    job_id = str(uuid.uuid4())
+    if not (BASE_VIDEOS / base_video).exists():
+        raise HTTPException(status_code=404, detail=f"Base video not found: {base_video}")
     
-    try:
-        video_path = generate_video_from_text(
-            text, 
-            base_video, 
-            job_id, 
-            voice_type,
-            story_title=post.title,
-            subreddit=post.subreddit
-        )
-        return {
-            "job_id": job_id,
-            "status": "completed",
-            "video_path": video_path,
-            "post_info": {
-                "id": post.id,
-                "title": post.title,
-                "score": post.score,
-                "subreddit": post.subreddit,
-                "word_count": word_count(text)
-            },
-            "message": "Video generated from highest scoring post with YouTube Shorts metadata"
-        }
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Video generation failed: {str(e)}")
+    job_id = secrets.token_hex(16)
+    await run_in_threadpool(
+        video_job_queue.enqueue,
+        job_id,
+        text,
+        base_video,
+        voice_type,
+        story_title=post.title,
+        subreddit=post.subreddit,
+        post_id=post.id
+    )
+    return {
+        "job_id": job_id,
+        "status": "pending",
+        "post_info": {
+            "id": post.id,
+            "title": post.title,
+            "score": post.score,
+            "subreddit": post.subreddit,
+            "word_count": post.word_count
+        },
+        "message": "Video generation queued for highest scoring post - poll /video/status/{job_id} for progress"
+    }
+
+
+@router.get("/video/status/{job_id}")
+async def get_video_status(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Return the current state of a queued video job."""
+    result = await db.execute(select(VideoJob).where(VideoJob.job_id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "post_id": job.post_id,
+        "video_path": job.video_path,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+
 
+BASE_VIDEO_SUFFIXES = frozenset({'.mp4', '.mov', '.avi'})
+_base_videos_cache = {"mtime": None, "videos": []}
 
 @router.get("/video/bases/")
 def list_base_videos():
-    """List available base videos."""
+    """List available base videos (rescanned only when the directory changes)."""
     base_dir = Path(__file__).resolve().parent.parent.parent / "media" / "base_videos"
-    if not base_dir.exists():
+    try:
+        mtime = base_dir.stat().st_mtime_ns
+    except FileNotFoundError:
         return {"base_videos": []}
     
-    videos = [f.name for f in base_dir.iterdir() if f.suffix.lower() in ['.mp4', '.mov', '.avi']]
-    return {"base_videos": videos}
+    if _base_videos_cache["mtime"] != mtime:
+        _base_videos_cache["videos"] = [
+            f.name for f in base_dir.iterdir() if f.suffix.lower() in BASE_VIDEO_SUFFIXES
+        ]
+        _base_videos_cache["mtime"] = mtime
+    return {"base_videos": _base_videos_cache["videos"]}
@@ -5,9 +5,16 @@ Uses pydantic-settings for environment variable handling and YAML config loading
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 from typing import List, Optional
+from functools import lru_cache
 import yaml
 from pathlib import Path
 
+# libyaml's C loader when available, pure-Python otherwise
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 
 class AutomationSettings(BaseSettings):
     """Automation-related settings from YAML config"""
@@ -33,6 +40,13 @@ class DatabaseSettings(BaseSettings):
     retention_days: int = 90  # Days to keep posted records
 
 
+@lru_cache(maxsize=8)
+def _read_yaml_config(path: str, mtime_ns: int) -> dict:
+    """Parse a YAML config file; cached until the file's mtime changes"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=YamlLoader) or {}
+
+
 class Settings(BaseSettings):
     """Main application settings"""
     model_config = SettingsConfigDict(
@@ -77,8 +91,7 @@ class Settings(BaseSettings):
             self.database = DatabaseSettings()
             return
         
-        with open(config_path, 'r') as f:
-            config_data = yaml.safe_load(f)
+        config_data = _read_yaml_config(str(config_path), config_path.stat().st_mtime_ns)
         
         # Load sub-settings from YAML
         self.automation = AutomationSettings(**config_data.get('automation', {}))
@@ -90,5 +103,5 @@ class Settings(BaseSettings):
         self.load_automation_config()
 
 
-# Global settings instance
+# Global settings instance - import this rather than constructing Settings()
 settings = Settings()
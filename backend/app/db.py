@@ -1,12 +1,93 @@
+from contextlib import contextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app.config import settings
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./stories.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+# Async drivers for the sync URLs we support
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# INSERT constructs with ON CONFLICT DO NOTHING, per supported backend
+CONFLICT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def _engine_kwargs(url: str) -> dict:
+    """Connection pool settings for the configured database"""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite connections are opened per thread; the default pool is fine
+        return {"connect_args": {"check_same_thread": False}}
+
+    # Server databases: room for API + scheduler + batch concurrency, and
+    # drop connections the server has silently closed
+    return {
+        "pool_size": 20,
+        "max_overflow": 40,
+        "pool_pre_ping": True,
+        "pool_recycle": 3600,
+    }
+
+
+def _async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(
+            f"Unsupported database backend '{backend}' in database_url; "
+            f"supported: {', '.join(ASYNC_DRIVERS)}"
+        )
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# Resolved (and the backend checked) before any engine is created
+ASYNC_SQLALCHEMY_DATABASE_URL = _async_url(SQLALCHEMY_DATABASE_URL)
+
+# Sync engine for schedulers, services and scripts (run in worker threads)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_kwargs(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine for API handlers so DB I/O doesn't hold a threadpool slot
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    **{k: v for k, v in _engine_kwargs(SQLALCHEMY_DATABASE_URL).items() if k != "connect_args"}
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
+def insert_ignore_duplicates(model, rows: list, index_elements: list):
+    """
+    Build a bulk INSERT that skips rows conflicting on a unique index.
+
+    Args:
+        model: Mapped class to insert into
+        rows: Column dicts, one per row (must be non-empty)
+        index_elements: Columns of the unique index to check
+
+    Returns:
+        INSERT ... ON CONFLICT DO NOTHING statement for the configured dialect
+    """
+    # The backend was checked against the supported ones at import
+    insert = CONFLICT_INSERTS[make_url(SQLALCHEMY_DATABASE_URL).get_backend_name()]
+    return insert(model).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+
+
 def get_db():
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -14,3 +95,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def session_scope():
+    """Session for code outside a request: commits on success, rolls back on error"""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
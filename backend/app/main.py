@@ -1,12 +1,17 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.api.endpoints import router
 from app.db import Base, engine
 from app.scheduler import start_scheduler
 from automation.scheduler import automation_scheduler
+from app.services.video_jobs import video_job_queue
 from app.utils.logger import logger
 from fastapi.middleware.cors import CORSMiddleware 
 
-app = FastAPI(title="Narrify - Reddit Video Automation API")
+app = FastAPI(
+    title="Narrify - Reddit Video Automation API",
+    default_response_class=ORJSONResponse
+)
 Base.metadata.create_all(bind=engine)
 app.include_router(router, prefix="/api")
 
@@ -25,6 +30,10 @@ async def startup_event():
     """Initialize schedulers and services on startup"""
     logger.info("Starting Narrify application")
     
+    # Jobs from a previous run can't finish any more; don't report them
+    # as pending/processing forever
+    video_job_queue.fail_interrupted_jobs()
+    
     # Start Reddit scraping scheduler
     start_scheduler()
     logger.info("Reddit scraping scheduler started")
@@ -40,6 +49,8 @@ async def shutdown_event():
     logger.info("Shutting down Narrify application")
     automation_scheduler.stop()
     logger.info("Automation scheduler stopped")
+    video_job_queue.shutdown()
+    logger.info("Video job queue stopped")
 
 @app.get("/")
 async def root():
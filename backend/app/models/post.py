@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum, Index
 from datetime import datetime
 from app.db import Base
 import enum
@@ -12,11 +12,19 @@ class GenerationStatus(str, enum.Enum):
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Serves subreddit + min score/word filters already ordered by score
+        Index("ix_posts_subreddit_score_words", "subreddit", "score", "word_count"),
+        # Serves generation selection: score order with duration estimate inputs
+        Index("ix_posts_score_words", "score", "word_count", "title_word_count"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     reddit_id = Column(String, unique=True, index=True)
     subreddit = Column(String, index=True)
     title = Column(String)
     story = Column(Text)
+    word_count = Column(Integer, index=True)  # Of the cleaned story, set at insert
+    title_word_count = Column(Integer)  # Title is narrated too; used for duration estimates
     score = Column(Integer, index=True)  # Added index for sorting
     num_comments = Column(Integer)
     url = Column(String)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+from app.db import Base
+from app.models.post import GenerationStatus
+
+class VideoJob(Base):
+    """Video generation job queued from the API"""
+    __tablename__ = "video_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, unique=True, index=True)
+    post_id = Column(Integer, nullable=True)
+    status = Column(String, default=GenerationStatus.PENDING.value)
+    video_path = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,12 +1,12 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from app.services.reddit_scraper import RedditScraper
-from app.db import SessionLocal
+from app.db import SessionLocal, insert_ignore_duplicates
 from app.models.post import Post
-from app.utils.text_cleaning import clean_story, word_count
+from app.utils.text_cleaning import word_count
 from app.utils.logger import logger
 from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 def scheduled_scrape():
     """Daily Reddit scraping job"""
@@ -25,34 +25,40 @@ def scheduled_scrape():
     total_new = 0
     per_subreddit = {}
     
+    def fetch(subreddit):
+        logger.info(f"📱 Scraping r/{subreddit}...")
+        # Fetch top posts from the last year
+        posts = RedditScraper(subreddit).fetch_top_posts(time_filter='year', limit=100)
+        # The scraper already cleaned each story; only the counts are added
+        for p in posts:
+            p["word_count"] = word_count(p["story"])
+            p["title_word_count"] = word_count(p["title"] or "")
+        return posts
+    
     try:
-        for subreddit in subreddits:
-            logger.info(f"📱 Scraping r/{subreddit}...")
+        # Fetch subreddits concurrently; two workers keeps us well under
+        # Reddit's per-IP rate limit without the old fixed sleep between calls
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="reddit-fetch") as executor:
+            futures = {subreddit: executor.submit(fetch, subreddit) for subreddit in subreddits}
+        
+        for subreddit, future in futures.items():
             try:
-                scraper = RedditScraper(subreddit)
-                # Fetch top posts from the last year
-                posts = scraper.fetch_top_posts(time_filter='year', limit=100)
-                new_count = 0
+                posts = future.result()
+                rows = [
+                    p for p in posts
+                    if p["score"] >= min_score and p["story"] and p["word_count"] >= min_words
+                ]
                 
-                for p in posts:
-                    if (
-                        p["score"] >= min_score and
-                        p["story"] and
-                        word_count(clean_story(p["story"])) >= min_words
-                    ):
-                        exists = db.query(Post).filter_by(reddit_id=p["reddit_id"]).first()
-                        if not exists:
-                            post_obj = Post(**{**p, "story": clean_story(p["story"])})
-                            db.add(post_obj)
-                            new_count += 1
+                # Single atomic insert; posts already stored are skipped by the unique index
+                new_count = 0
+                if rows:
+                    stmt = insert_ignore_duplicates(Post, rows, ["reddit_id"])
+                    new_count = len(db.execute(stmt.returning(Post.id)).all())
                 
                 per_subreddit[subreddit] = new_count
                 total_new += new_count
                 logger.info(f"✅ Found {new_count} new posts from r/{subreddit}")
                 
-                # Small delay to avoid rate limiting
-                time.sleep(2)
-                
             except Exception as e:
                 logger.error(f"❌ Error scraping r/{subreddit}: {e}")
                 per_subreddit[subreddit] = 0
@@ -86,9 +92,13 @@ def start_scheduler():
     logger.info(f"📅 Reddit scraper scheduled to run daily at 6:00 AM")
     logger.info(f"Next run: {scheduler.get_job('reddit_scraper').next_run_time}")
     
-    # Run immediately on startup for testing
-    logger.info("🚀 Running initial Reddit scrape...")
-    try:
-        scheduled_scrape()
-    except Exception as e:
-        logger.error(f"⚠️ Initial scrape failed: {e}")
+    # Run once right away on the scheduler's worker thread so app startup
+    # doesn't block on the scrape
+    scheduler.add_job(
+        scheduled_scrape,
+        id='reddit_scraper_initial',
+        name='Initial Reddit Scrape',
+        next_run_time=datetime.now(),
+        replace_existing=True
+    )
+    logger.info("🚀 Initial Reddit scrape queued")
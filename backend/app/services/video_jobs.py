@@ -0,0 +1,161 @@
+"""
+Background job queue for API-triggered video generation.
+Renders run on a worker thread so request handlers return immediately;
+job state is persisted in the video_jobs table for status polling.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.db import session_scope
+from app.models.post import GenerationStatus
+from app.models.video_job import VideoJob
+from app.utils.logger import logger
+
+
+class VideoJobQueue:
+    """Queue that renders videos off the request path"""
+
+    def __init__(self, max_workers: int = 1):
+        # One worker by default: TTS + Whisper + ffmpeg already saturate a
+        # low-RAM machine, so concurrent renders would just crash each other
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="video-job"
+        )
+        # job_id -> future for jobs not yet finished, so shutdown can
+        # record the ones it cancels
+        self._futures = {}
+        self._futures_lock = threading.Lock()
+
+    def enqueue(
+        self,
+        job_id: str,
+        text: str,
+        base_video: str,
+        voice_type: str,
+        story_title: Optional[str] = None,
+        subreddit: Optional[str] = None,
+        post_id: Optional[int] = None
+    ) -> str:
+        """
+        Record a pending job and schedule it on the worker.
+
+        Returns:
+            The job ID to poll for status
+        """
+        with session_scope() as db:
+            db.add(VideoJob(
+                job_id=job_id,
+                post_id=post_id,
+                status=GenerationStatus.PENDING.value
+            ))
+
+        future = self.executor.submit(
+            self._run,
+            job_id,
+            text,
+            base_video,
+            voice_type,
+            story_title,
+            subreddit
+        )
+        with self._futures_lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda done: self._forget(job_id, done))
+        logger.info("Video job queued", job_id=job_id, post_id=post_id)
+        return job_id
+
+    def _run(
+        self,
+        job_id: str,
+        text: str,
+        base_video: str,
+        voice_type: str,
+        story_title: Optional[str],
+        subreddit: Optional[str]
+    ) -> None:
+        """Render a queued job and record the outcome"""
+        try:
+            self._update(job_id, status=GenerationStatus.PROCESSING.value)
+
+            # Imported here so the API process only loads the TTS/Whisper
+            # stack once a render actually runs
+            from app.video.generator import generate_video_from_text
+
+            video_path = generate_video_from_text(
+                text,
+                base_video,
+                job_id,
+                voice_type,
+                story_title=story_title,
+                subreddit=subreddit
+            )
+            self._update(
+                job_id,
+                status=GenerationStatus.COMPLETED.value,
+                video_path=video_path
+            )
+            logger.info("Video job completed", job_id=job_id, video_path=video_path)
+        except Exception as e:
+            logger.error("Video job failed", exception=e, job_id=job_id)
+            try:
+                self._update(
+                    job_id,
+                    status=GenerationStatus.FAILED.value,
+                    error=str(e)
+                )
+            except Exception as update_error:
+                logger.error("Could not record video job failure", exception=update_error, job_id=job_id)
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs; ones that haven't started are marked failed"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self._futures_lock:
+            cancelled = [job_id for job_id, future in self._futures.items() if future.cancelled()]
+        if cancelled:
+            self._fail_jobs(
+                VideoJob.job_id.in_(cancelled),
+                "Cancelled at shutdown"
+            )
+            logger.info("Cancelled queued video jobs", count=len(cancelled))
+
+    def fail_interrupted_jobs(self) -> None:
+        """
+        Mark jobs left pending/processing by a previous run as failed.
+        Call at startup, before any job is queued: no worker is running
+        them any more, so they would otherwise never leave that state.
+        """
+        count = self._fail_jobs(
+            VideoJob.status.in_([
+                GenerationStatus.PENDING.value,
+                GenerationStatus.PROCESSING.value
+            ]),
+            "Interrupted by server restart"
+        )
+        if count:
+            logger.info("Marked interrupted video jobs as failed", count=count)
+
+    def _forget(self, job_id: str, future) -> None:
+        """Drop a finished job's future (cancelled ones stay for shutdown)"""
+        if future.cancelled():
+            return
+        with self._futures_lock:
+            self._futures.pop(job_id, None)
+
+    def _fail_jobs(self, condition, error: str) -> int:
+        """Mark the jobs matching condition as failed; returns how many"""
+        with session_scope() as db:
+            return db.query(VideoJob).filter(condition).update(
+                {"status": GenerationStatus.FAILED.value, "error": error},
+                synchronize_session=False
+            )
+
+    def _update(self, job_id: str, **fields) -> None:
+        """Persist job state changes"""
+        with session_scope() as db:
+            db.query(VideoJob).filter(VideoJob.job_id == job_id).update(fields)
+
+
+# Global video job queue instance
+video_job_queue = VideoJobQueue()
@@ -4,24 +4,36 @@ Handles post selection, video generation, upload, and cleanup.
 """
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 from typing import List, Tuple, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 
-from app.db import get_db, SessionLocal
+from app.db import get_db, SessionLocal, session_scope
 from app.models.post import Post, GenerationStatus
-from app.video.generator import generate_video_from_text
 from app.services.youtube_service import youtube_service
 from app.config import settings
 from app.utils.logger import logger
 
+# Generated videos allowed to wait for upload before generation pauses
+MAX_PENDING_UPLOADS = 2
+
+# YouTube metadata shared by every upload
+DESCRIPTION_TEMPLATE = "%s...\n\nFrom r/%s\nOriginal: %s\n\n#RedditStories #Shorts #Storytelling"
+BASE_TAGS = ('reddit', 'stories', 'shorts')
+
 
 class VideoService:
     """Service for managing video generation and upload workflow"""
     
     def __init__(self):
         self.youtube = youtube_service
+        self.cleanup_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="video-cleanup"
+        )
     
     def select_posts_for_generation(
         self,
@@ -36,11 +48,10 @@ class VideoService:
         longer posts in database for when you have a better computer.
         
         Selection strategy:
-        1. Get all unposted posts with score >= threshold
-        2. Calculate estimated duration for each
-        3. Prioritize posts ≤ max_duration_seconds
-        4. Sort by: duration_within_limit (yes/no), then score (desc)
-        5. Select top N that are within duration limit
+        1. Filter unposted posts with score >= threshold
+        2. Estimate duration from the stored story/title word counts
+        3. Select the top N by score within max_duration_seconds
+        4. Count the longer posts left for later
         
         Args:
             db: Database session
@@ -50,48 +61,36 @@ class VideoService:
         Returns:
             List of Post objects (only posts within duration limit)
         """
-        # Get all candidate posts
-        candidate_posts = db.query(Post).filter(
+        # Duration estimate, pushed into SQL:
+        # (story + title words, since the title is narrated) / 2.5 words per
+        # second / 1.3x speed multiplier <= max_duration_seconds
+        total_words = Post.word_count + func.coalesce(Post.title_word_count, 0)
+        max_words = max_duration_seconds * 2.5 * 1.3
+        
+        candidates = db.query(Post).filter(
             Post.posted == False,
             Post.generation_status.in_([
                 GenerationStatus.PENDING.value,
                 GenerationStatus.FAILED.value
             ]),
             Post.score >= settings.database.min_score_threshold
+        )
+        
+        # Higher score = better post = process first; long ones are saved
+        # for a better computer
+        selected_posts = candidates.filter(
+            total_words <= max_words
+        ).options(
+            # Load any relationships up front so the generation loop never
+            # lazy-loads per post
+            selectinload("*")
         ).order_by(
             Post.score.desc()
-        ).all()
-        
-        # Calculate estimated duration for each post and filter to only short ones
-        # Speaking rate: ~2.5 words/second (150 words/min)
-        # Also account for title narration and 1.3x speed multiplier
-        posts_with_duration = []
-        long_posts_count = 0
-        
-        for post in candidate_posts:
-            # Calculate word count (story + title if narrated)
-            story_words = len(post.story.split())
-            title_words = len(post.title.split()) if post.title else 0
-            total_words = story_words + title_words  # Title is narrated by default
-            
-            # Estimate base duration (before speed multiplier)
-            base_duration = total_words / 2.5  # 2.5 words per second
-            
-            # Account for 1.3x speed multiplier (video is sped up)
-            estimated_duration = base_duration / 1.3
-            
-            # Only include posts within duration limit (save long ones for better computer)
-            if estimated_duration <= max_duration_seconds:
-                posts_with_duration.append((post, estimated_duration))
-            else:
-                long_posts_count += 1
-        
-        # Sort by score (already sorted from query, but make it explicit)
-        # Higher score = better post = process first
-        posts_with_duration.sort(key=lambda x: x[0].score, reverse=True)
+        ).limit(count).all()
         
-        # Select top N posts
-        selected_posts = [post for post, duration in posts_with_duration[:count]]
+        long_posts_count = candidates.filter(
+            total_words > max_words
+        ).count()
         
         # Log selection summary
         if long_posts_count > 0:
@@ -123,9 +122,11 @@ class VideoService:
         start_time = time.time()
         
         try:
-            # Update status to PROCESSING
-            post.generation_status = GenerationStatus.PROCESSING.value
-            db.commit()
+            # Update status to PROCESSING (process_batch claims its whole
+            # batch up front, so this commit only happens for direct calls)
+            if post.generation_status != GenerationStatus.PROCESSING.value:
+                post.generation_status = GenerationStatus.PROCESSING.value
+                db.commit()
             
             logger.video_generation_start(
                 post_id=post.id,
@@ -133,7 +134,9 @@ class VideoService:
                 title=post.title
             )
             
-            # Generate video
+            # Generate video (imported lazily: loading the TTS/Whisper stack
+            # is only worth paying for once a render actually runs)
+            from app.video.generator import generate_video_from_text
             video_path = generate_video_from_text(
                 text=post.story,
                 base_video_name=base_video,
@@ -199,8 +202,8 @@ class VideoService:
             )
             
             # Create YouTube metadata (metadata is already embedded in video)
-            description = f"{post.story[:500]}...\n\nFrom r/{post.subreddit}\nOriginal: {post.url}\n\n#RedditStories #Shorts #Storytelling"
-            tags = ['reddit', 'stories', 'shorts', post.subreddit.lower(), 'reddit stories']
+            description = DESCRIPTION_TEMPLATE % (post.story[:500], post.subreddit, post.url)
+            tags = [*BASE_TAGS, post.subreddit.lower(), 'reddit stories']
             
             # Upload to YouTube
             video_id = self.youtube.upload_video(
@@ -242,6 +245,55 @@ class VideoService:
             )
             return None
     
+    def _upload_and_cleanup(
+        self,
+        post_id: int,
+        video_path: str,
+        delete_after_upload: bool
+    ) -> bool:
+        """
+        Upload a generated video on the upload worker thread.
+        Uses its own session since the batch session belongs to the
+        generating thread.
+        
+        Returns:
+            True if the upload succeeded
+        """
+        try:
+            with session_scope() as db:
+                post = db.get(Post, post_id)
+                video_id = self.upload_to_youtube(post, video_path, db)
+        except Exception as e:
+            logger.error(
+                f"Error uploading post {post_id}",
+                exception=e,
+                post_id=post_id
+            )
+            video_id = None
+        
+        if not video_id:
+            return False
+        
+        # Delete video file to conserve space, off the upload thread so the
+        # next upload can start right away
+        if delete_after_upload:
+            self._delete_video_file(video_path)
+        return True
+    
+    def _delete_video_file(self, video_path: str) -> None:
+        """Unlink a video file in the background, logging the outcome"""
+        def log_result(future):
+            exception = future.exception()
+            if exception:
+                logger.warning(
+                    f"Failed to delete video file: {video_path}",
+                    exception=exception
+                )
+            else:
+                logger.info(f"Deleted video file: {video_path}")
+        
+        self.cleanup_executor.submit(os.unlink, video_path).add_done_callback(log_result)
+    
     def process_batch(
         self,
         count: int = 5,
@@ -250,6 +302,10 @@ class VideoService:
         """
         Process a batch of videos: generate and upload.
         
+        Uploads run on a background thread so the next video generates while
+        the previous one uploads. At most MAX_PENDING_UPLOADS finished videos
+        wait on disk at a time.
+        
         Args:
             count: Number of videos to process
             delete_after_upload: Delete video files after successful upload
@@ -260,6 +316,7 @@ class VideoService:
         db = SessionLocal()
         successful = 0
         failed = 0
+        post_ids = []
         
         try:
             # Select posts
@@ -269,57 +326,86 @@ class VideoService:
                 logger.warning("No posts available for video generation")
                 return 0, 0
             
-            # Process each post
-            for post in posts:
-                video_path = None
-                
-                try:
-                    # Generate video
-                    video_path = self.generate_video(post, db)
-                    
-                    if not video_path:
-                        failed += 1
-                        continue
+            # Claim the whole batch in one UPDATE instead of a commit per post
+            post_ids = [post.id for post in posts]
+            db.query(Post).filter(Post.id.in_(post_ids)).update(
+                {Post.generation_status: GenerationStatus.PROCESSING.value},
+                synchronize_session="fetch"
+            )
+            db.commit()
+            
+            uploads = []
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="youtube-upload") as uploader:
+                # Process each post
+                for post in posts:
+                    video_path = None
                     
-                    # Upload to YouTube
-                    video_id = self.upload_to_youtube(post, video_path, db)
+                    try:
+                        # Generate video
+                        video_path = self.generate_video(post, db)
+                        
+                        if not video_path:
+                            failed += 1
+                            continue
+                        
+                        # Upload to YouTube while the next video generates
+                        uploads.append(uploader.submit(
+                            self._upload_and_cleanup,
+                            post.id,
+                            video_path,
+                            delete_after_upload
+                        ))
+                        
+                        # Don't let finished videos pile up on disk
+                        in_flight = [f for f in uploads if not f.done()]
+                        while len(in_flight) > MAX_PENDING_UPLOADS:
+                            wait(in_flight, return_when=FIRST_COMPLETED)
+                            in_flight = [f for f in in_flight if not f.done()]
                     
-                    if video_id:
-                        successful += 1
+                    except Exception as e:
+                        logger.error(
+                            f"Error processing post {post.id}",
+                            exception=e,
+                            post_id=post.id,
+                            reddit_id=post.reddit_id
+                        )
+                        failed += 1
                         
-                        # Delete video file to conserve space
-                        if delete_after_upload:
+                        # Cleanup video file if exists
+                        if video_path:
                             try:
-                                os.remove(video_path)
-                                logger.info(f"Deleted video file: {video_path}")
-                            except Exception as e:
-                                logger.warning(
-                                    f"Failed to delete video file: {video_path}",
-                                    exception=e
-                                )
-                    else:
-                        failed += 1
-                
-                except Exception as e:
-                    logger.error(
-                        f"Error processing post {post.id}",
-                        exception=e,
-                        post_id=post.id,
-                        reddit_id=post.reddit_id
-                    )
+                                os.unlink(video_path)
+                            except OSError:
+                                pass
+            
+            # Executor has drained; tally upload results
+            for upload in uploads:
+                if upload.result():
+                    successful += 1
+                else:
                     failed += 1
-                    
-                    # Cleanup video file if exists
-                    if video_path and os.path.exists(video_path):
-                        try:
-                            os.remove(video_path)
-                        except:
-                            pass
             
             return successful, failed
             
         finally:
+            # Release any claimed posts that never got a final status
+            if post_ids:
+                db.rollback()
+                db.query(Post).filter(
+                    Post.id.in_(post_ids),
+                    Post.generation_status == GenerationStatus.PROCESSING.value
+                ).update(
+                    {Post.generation_status: GenerationStatus.PENDING.value},
+                    synchronize_session=False
+                )
+                db.commit()
             db.close()
+            
+            # Subtitle models stay loaded across the batch; free them once
+            # it's done (already imported by generation, so this is cheap)
+            if post_ids:
+                from app.video.srt import release_models
+                release_models()
 
 
 # Global video service instance
@@ -3,7 +3,7 @@ YouTube API service for automated video uploads.
 Handles OAuth authentication and video upload with metadata.
 """
 import os
-import pickle
+import json
 from pathlib import Path
 from typing import Optional, Dict, Any
 from googleapiclient.discovery import build
@@ -19,6 +19,9 @@ from app.utils.logger import logger
 # YouTube API scopes
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
+# Tags added to every upload
+DEFAULT_TAGS = tuple(settings.youtube.default_tags)
+
 
 class YouTubeService:
     """Service for uploading videos to YouTube"""
@@ -38,14 +41,18 @@ class YouTubeService:
         Subsequent times:
         - Loads credentials from token file
         - Refreshes if expired
+        
+        No-op once a client has been built in this process.
         """
+        if self.youtube is not None:
+            return
+        
         token_file = Path(settings.youtube_token_file)
         credentials_file = Path(settings.youtube_client_secrets_file)
         
         # Check if we have valid saved credentials
         if token_file.exists():
-            with open(token_file, 'rb') as token:
-                self.credentials = pickle.load(token)
+            self.credentials = self._load_token(token_file)
         
         # If no valid credentials, get new ones
         if not self.credentials or not self.credentials.valid:
@@ -69,15 +76,52 @@ class YouTubeService:
                 self.credentials = flow.run_local_server(port=8080)
             
             # Save credentials for future use
-            token_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(token_file, 'wb') as token:
-                pickle.dump(self.credentials, token)
+            self._save_token(token_file)
             logger.info("YouTube OAuth credentials saved")
         
-        # Build YouTube API client
-        self.youtube = build('youtube', 'v3', credentials=self.credentials)
+        # Build YouTube API client from the discovery document bundled with
+        # google-api-python-client rather than fetching it over the network
+        self.youtube = build(
+            'youtube',
+            'v3',
+            credentials=self.credentials,
+            static_discovery=True
+        )
         logger.info("YouTube API client initialized")
     
+    def _load_token(self, token_file: Path) -> Optional[Credentials]:
+        """
+        Load saved OAuth credentials.
+        Tokens written by older versions were pickled; those are read once
+        and rewritten as JSON.
+        """
+        try:
+            info = json.loads(token_file.read_text(encoding='utf-8'))
+        except (UnicodeDecodeError, ValueError):
+            info = None
+        
+        if info is not None:
+            try:
+                return Credentials.from_authorized_user_info(info, SCOPES)
+            except ValueError as e:
+                logger.warning("Saved YouTube token is incomplete - re-authenticating", exception=e)
+                return None
+        
+        import pickle
+        with open(token_file, 'rb') as token:
+            credentials = pickle.load(token)
+        self.credentials = credentials
+        self._save_token(token_file)
+        logger.info("Converted pickled YouTube token to JSON")
+        return credentials
+    
+    def _save_token(self, token_file: Path) -> None:
+        """Write credentials as JSON, atomically so a crash can't corrupt the token"""
+        token_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = token_file.with_suffix('.tmp')
+        tmp_file.write_text(self.credentials.to_json(), encoding='utf-8')
+        os.replace(tmp_file, token_file)
+    
     def upload_video(
         self,
         video_path: str,
@@ -105,7 +149,9 @@ class YouTubeService:
             self.authenticate()
         
         video_file = Path(video_path)
-        if not video_file.exists():
+        try:
+            file_size = os.stat(video_file).st_size
+        except FileNotFoundError:
             logger.error(f"Video file not found: {video_path}")
             return None
         
@@ -113,9 +159,7 @@ class YouTubeService:
         full_title = f"{title}{settings.youtube.title_suffix}"
         
         # Combine default tags with provided tags
-        all_tags = list(settings.youtube.default_tags)
-        if tags:
-            all_tags.extend(tags)
+        all_tags = [*DEFAULT_TAGS, *tags] if tags else list(DEFAULT_TAGS)
         
         # Prepare video metadata
         body = {
@@ -131,15 +175,20 @@ class YouTubeService:
             }
         }
         
-        # Create media upload object
+        # Create media upload object. chunksize=-1 streams the whole file in
+        # one request of the resumable session instead of a round-trip per
+        # 1MB chunk; the session can still resume if that request fails
         media = MediaFileUpload(
             str(video_file),
-            chunksize=1024*1024,  # 1MB chunks
+            chunksize=-1,
             resumable=True
         )
         
         try:
-            logger.info(f"Uploading video to YouTube: {full_title}")
+            logger.info(
+                f"Uploading video to YouTube: {full_title}",
+                size_mb=round(file_size / 1_048_576, 1)
+            )
             
             # Execute upload
             request = self.youtube.videos().insert(
@@ -149,11 +198,15 @@ class YouTubeService:
             )
             
             response = None
+            last_logged = -10
             while response is None:
                 status, response = request.next_chunk()
                 if status:
                     progress = int(status.progress() * 100)
-                    logger.debug(f"Upload progress: {progress}%")
+                    # Only log at 10% milestones
+                    if progress - last_logged >= 10:
+                        logger.debug(f"Upload progress: {progress}%")
+                        last_logged = progress
             
             video_id = response['id']
             logger.info(
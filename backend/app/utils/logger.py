@@ -2,10 +2,12 @@
 Centralized logging utility for Narrify automation system.
 Provides structured logging with file rotation and optional Slack notifications.
 """
+import atexit
 import logging
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 from typing import Optional
 
@@ -25,13 +27,20 @@ class NarrifyLogger:
         self.log_file = Path(log_file)
         self.log_level = getattr(logging, log_level.upper(), logging.INFO)
         
-        # Ensure logs directory exists
-        self.log_file.parent.mkdir(parents=True, exist_ok=True)
-        
         # Create logger
         self.logger = logging.getLogger(name)
         self.logger.setLevel(self.log_level)
         
+        # The underlying logger is process-global; if another instance
+        # already set up its handlers, share them instead of rebuilding
+        existing_listener = getattr(self.logger, "_narrify_listener", None)
+        if existing_listener is not None:
+            self.listener = existing_listener
+            return
+        
+        # Ensure logs directory exists
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        
         # Remove existing handlers to avoid duplicates
         self.logger.handlers.clear()
         
@@ -43,7 +52,6 @@ class NarrifyLogger:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
         
         # File handler with rotation
         file_handler = RotatingFileHandler(
@@ -58,35 +66,55 @@ class NarrifyLogger:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
+        
+        # Console/file writes (and rollovers) happen on a listener thread;
+        # logging calls on the render/upload paths only enqueue the record
+        log_queue = queue.Queue(-1)
+        self.logger.addHandler(QueueHandler(log_queue))
+        self.listener = QueueListener(
+            log_queue,
+            console_handler,
+            file_handler,
+            respect_handler_level=True
+        )
+        self.listener.start()
+        atexit.register(self.listener.stop)
+        self.logger._narrify_listener = self.listener
+    
+    def _log(
+        self,
+        level: int,
+        message: str,
+        exception: Optional[Exception] = None,
+        /,
+        **kwargs
+    ):
+        """Format key=value context and emit, skipping all work if level is disabled"""
+        if not self.logger.isEnabledFor(level):
+            return
+        if kwargs:
+            extra_info = " | ".join(f"{k}={v}" for k, v in kwargs.items())
+            message = f"{message} | {extra_info}"
+        if exception:
+            self.logger.log(level, f"{message} | Exception: {str(exception)}", exc_info=True)
+        else:
+            self.logger.log(level, message)
     
     def info(self, message: str, **kwargs):
         """Log info message"""
-        extra_info = " | ".join(f"{k}={v}" for k, v in kwargs.items())
-        full_message = f"{message} | {extra_info}" if extra_info else message
-        self.logger.info(full_message)
+        self._log(logging.INFO, message, **kwargs)
     
     def error(self, message: str, exception: Optional[Exception] = None, **kwargs):
         """Log error message with optional exception"""
-        extra_info = " | ".join(f"{k}={v}" for k, v in kwargs.items())
-        full_message = f"{message} | {extra_info}" if extra_info else message
-        
-        if exception:
-            self.logger.error(f"{full_message} | Exception: {str(exception)}", exc_info=True)
-        else:
-            self.logger.error(full_message)
+        self._log(logging.ERROR, message, exception, **kwargs)
     
     def warning(self, message: str, **kwargs):
         """Log warning message"""
-        extra_info = " | ".join(f"{k}={v}" for k, v in kwargs.items())
-        full_message = f"{message} | {extra_info}" if extra_info else message
-        self.logger.warning(full_message)
+        self._log(logging.WARNING, message, **kwargs)
     
     def debug(self, message: str, **kwargs):
         """Log debug message"""
-        extra_info = " | ".join(f"{k}={v}" for k, v in kwargs.items())
-        full_message = f"{message} | {extra_info}" if extra_info else message
-        self.logger.debug(full_message)
+        self._log(logging.DEBUG, message, **kwargs)
     
     def video_generation_start(self, post_id: int, reddit_id: str, title: str):
         """Log video generation start"""
@@ -163,6 +191,9 @@ class NarrifyLogger:
 # Global logger instance
 logger = NarrifyLogger()
 
+# Loggers handed out by get_logger, keyed by name
+_loggers = {logger.name: logger}
+
 
 def get_logger(
     name: str = "narrify",
@@ -170,4 +201,6 @@ def get_logger(
     log_level: str = "INFO"
 ) -> NarrifyLogger:
     """Get or create a logger instance"""
-    return NarrifyLogger(name=name, log_file=log_file, log_level=log_level)
+    if name not in _loggers:
+        _loggers[name] = NarrifyLogger(name=name, log_file=log_file, log_level=log_level)
+    return _loggers[name]
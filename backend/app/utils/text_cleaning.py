@@ -1,7 +1,7 @@
 import re
 
-def number_to_words(num: int) -> str:
-    """Convert numbers 0-99 to words for TTS."""
+def _spell_number(num: int) -> str:
+    """Spell out 0-99 in words (used once to build _NUM_WORDS)."""
     ones = ['', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
     teens = ['ten', 'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 
              'sixteen', 'seventeen', 'eighteen', 'nineteen']
@@ -11,13 +11,135 @@ def number_to_words(num: int) -> str:
         return ones[num]
     elif num < 20:
         return teens[num - 10]
-    elif num < 100:
-        ten = num // 10
-        one = num % 10
-        if one == 0:
-            return tens[ten]
-        return f"{tens[ten]} {ones[one]}"
-    return str(num)
+    ten = num // 10
+    one = num % 10
+    if one == 0:
+        return tens[ten]
+    return f"{tens[ten]} {ones[one]}"
+
+# Words for every value the age/gender pattern (\d{1,2}) can match
+_NUM_WORDS = tuple(_spell_number(i) for i in range(100))
+
+def number_to_words(num: int) -> str:
+    """Convert numbers 0-99 to words for TTS."""
+    return _NUM_WORDS[num] if 0 <= num < 100 else str(num)
+
+# Common Reddit acronyms, expanded for better pronunciation
+REDDIT_ACRONYMS = {
+    r'\bAITA\b': 'Am I the asshole',
+    r'\bTIFU\b': 'Today I fucked up',
+    r'\bIMO\b': 'in my opinion',
+    r'\bIMHO\b': 'in my humble opinion',
+    r'\bTBH\b': 'to be honest',
+    r'\bIRL\b': 'in real life',
+    r'\bBTW\b': 'by the way',
+    r'\bFWIW\b': 'for what it\'s worth',
+    r'\bSO\b': 'significant other',  # Context: "my SO"
+    r'\bBF\b': 'boyfriend',
+    r'\bGF\b': 'girlfriend',
+    r'\bDH\b': 'dear husband',
+    r'\bDW\b': 'dear wife',
+}
+
+# Expand contractions that TTS struggles with
+# Order matters - do compound contractions first, then simple ones
+CONTRACTIONS = {
+    # Compound contractions (do these first)
+    r"\bshouldn't've\b": "should not have",
+    r"\bcouldn't've\b": "could not have",
+    r"\bwouldn't've\b": "would not have",
+    r"\bmightn't've\b": "might not have",
+    r"\bmustn't've\b": "must not have",
+    r"\by'all'd've\b": "you all would have",
+    r"\bwould've\b": "would have",
+    r"\bcould've\b": "could have",
+    r"\bshould've\b": "should have",
+    r"\bmight've\b": "might have",
+    r"\bmust've\b": "must have",
+    
+    # Negative contractions
+    r"\bwon't\b": "will not",
+    r"\bcan't\b": "cannot",
+    r"\bain't\b": "am not",
+    r"\baren't\b": "are not",
+    r"\bwasn't\b": "was not",
+    r"\bweren't\b": "were not",
+    r"\bhasn't\b": "has not",
+    r"\bhaven't\b": "have not",
+    r"\bhadn't\b": "had not",
+    r"\bdoesn't\b": "does not",
+    r"\bdon't\b": "do not",
+    r"\bdidn't\b": "did not",
+    r"\bisn't\b": "is not",
+    r"\bshouldn't\b": "should not",
+    r"\bcouldn't\b": "could not",
+    r"\bwouldn't\b": "would not",
+    r"\bmightn't\b": "might not",
+    r"\bmustn't\b": "must not",
+    
+    # Positive contractions (these are trickier - be careful with context)
+    r"\bI'm\b": "I am",
+    r"\byou're\b": "you are",
+    r"\bhe's\b": "he is",
+    r"\bshe's\b": "she is",
+    r"\bit's\b": "it is",
+    r"\bwe're\b": "we are",
+    r"\bthey're\b": "they are",
+    r"\bthat's\b": "that is",
+    r"\bwho's\b": "who is",
+    r"\bwhat's\b": "what is",
+    r"\bwhere's\b": "where is",
+    r"\bwhen's\b": "when is",
+    r"\bwhy's\b": "why is",
+    r"\bhow's\b": "how is",
+    r"\bthere's\b": "there is",
+    r"\bhere's\b": "here is",
+    
+    # Other common ones
+    r"\bI'll\b": "I will",
+    r"\byou'll\b": "you will",
+    r"\bhe'll\b": "he will",
+    r"\bshe'll\b": "she will",
+    r"\bit'll\b": "it will",
+    r"\bwe'll\b": "we will",
+    r"\bthey'll\b": "they will",
+    r"\bthat'll\b": "that will",
+    
+    r"\bI've\b": "I have",
+    r"\byou've\b": "you have",
+    r"\bwe've\b": "we have",
+    r"\bthey've\b": "they have",
+    
+    r"\bI'd\b": "I would",
+    r"\byou'd\b": "you would",
+    r"\bhe'd\b": "he would",
+    r"\bshe'd\b": "she would",
+    r"\bwe'd\b": "we would",
+    r"\bthey'd\b": "they would",
+    r"\bthat'd\b": "that would",
+    
+    r"\by'all\b": "you all",
+}
+
+def _alternation(table: dict):
+    """
+    Compile a {r'\bword\b': expansion} table into one case-insensitive
+    regex plus a group-name lookup, so a single scan handles every entry.
+    Each word gets its own named group and the match is looked up by
+    m.lastgroup: IGNORECASE also matches characters that don't lowercase
+    back to the word (ſ for s, ı for i). Longest words go first so
+    compounds (shouldn't've) win over their prefixes (shouldn't).
+    """
+    words = [pattern[2:-2].replace("\\'", "'") for pattern in table]
+    lookup = {f"w{index}": expansion for index, expansion in enumerate(table.values())}
+    order = sorted(range(len(words)), key=lambda index: len(words[index]), reverse=True)
+    alternatives = "|".join(f"(?P<w{index}>{re.escape(words[index])})" for index in order)
+    return re.compile(rf"\b(?:{alternatives})\b", re.IGNORECASE), lookup
+
+# preprocess_for_tts patterns, compiled once at import
+_AGE_GENDER_RE = re.compile(r'\b(\d{1,2})([MF])\b', re.IGNORECASE)
+_ACRONYM_RE, _ACRONYM_LOOKUP = _alternation(REDDIT_ACRONYMS)
+_CONTRACTION_RE, _CONTRACTION_LOOKUP = _alternation(CONTRACTIONS)
 
 def preprocess_for_tts(text: str) -> str:
     """
@@ -27,141 +149,53 @@ def preprocess_for_tts(text: str) -> str:
     # Convert age/gender abbreviations (17M, 25F, etc.) to spoken form
     # Pattern: number followed by M or F (case insensitive)
     def replace_age_gender(match):
-        num = int(match.group(1))
-        gender = match.group(2).upper()
-        num_words = number_to_words(num)
-        return f"{num_words} {gender}"
+        return f"{_NUM_WORDS[int(match.group(1))]} {match.group(2).upper()}"
     
     # Match patterns like "17M", "25F", "(17M)", "I'm 17M", "I am 17F"
-    text = re.sub(r'\b(\d{1,2})([MF])\b', replace_age_gender, text, flags=re.IGNORECASE)
+    text = _AGE_GENDER_RE.sub(replace_age_gender, text)
     
     # Handle common Reddit acronyms for better pronunciation
-    reddit_acronyms = {
-        r'\bAITA\b': 'Am I the asshole',
-        r'\bTIFU\b': 'Today I fucked up',
-        r'\bIMO\b': 'in my opinion',
-        r'\bIMHO\b': 'in my humble opinion',
-        r'\bTBH\b': 'to be honest',
-        r'\bIRL\b': 'in real life',
-        r'\bBTW\b': 'by the way',
-        r'\bFWIW\b': 'for what it\'s worth',
-        r'\bSO\b': 'significant other',  # Context: "my SO"
-        r'\bBF\b': 'boyfriend',
-        r'\bGF\b': 'girlfriend',
-        r'\bDH\b': 'dear husband',
-        r'\bDW\b': 'dear wife',
-    }
-    
-    for acronym, expansion in reddit_acronyms.items():
-        text = re.sub(acronym, expansion, text, flags=re.IGNORECASE)
-    
-    # Expand contractions that TTS struggles with
-    # Order matters - do compound contractions first, then simple ones
-    contractions = {
-        # Compound contractions (do these first)
-        r"\bshouldn't've\b": "should not have",
-        r"\bcouldn't've\b": "could not have",
-        r"\bwouldn't've\b": "would not have",
-        r"\bmightn't've\b": "might not have",
-        r"\bmustn't've\b": "must not have",
-        r"\by'all'd've\b": "you all would have",
-        r"\bwould've\b": "would have",
-        r"\bcould've\b": "could have",
-        r"\bshould've\b": "should have",
-        r"\bmight've\b": "might have",
-        r"\bmust've\b": "must have",
-        
-        # Negative contractions
-        r"\bwon't\b": "will not",
-        r"\bcan't\b": "cannot",
-        r"\bain't\b": "am not",
-        r"\baren't\b": "are not",
-        r"\bwasn't\b": "was not",
-        r"\bweren't\b": "were not",
-        r"\bhasn't\b": "has not",
-        r"\bhaven't\b": "have not",
-        r"\bhadn't\b": "had not",
-        r"\bdoesn't\b": "does not",
-        r"\bdon't\b": "do not",
-        r"\bdidn't\b": "did not",
-        r"\bisn't\b": "is not",
-        r"\bshouldn't\b": "should not",
-        r"\bcouldn't\b": "could not",
-        r"\bwouldn't\b": "would not",
-        r"\bmightn't\b": "might not",
-        r"\bmustn't\b": "must not",
-        
-        # Positive contractions (these are trickier - be careful with context)
-        r"\bI'm\b": "I am",
-        r"\byou're\b": "you are",
-        r"\bhe's\b": "he is",
-        r"\bshe's\b": "she is",
-        r"\bit's\b": "it is",
-        r"\bwe're\b": "we are",
-        r"\bthey're\b": "they are",
-        r"\bthat's\b": "that is",
-        r"\bwho's\b": "who is",
-        r"\bwhat's\b": "what is",
-        r"\bwhere's\b": "where is",
-        r"\bwhen's\b": "when is",
-        r"\bwhy's\b": "why is",
-        r"\bhow's\b": "how is",
-        r"\bthere's\b": "there is",
-        r"\bhere's\b": "here is",
-        
-        # Other common ones
-        r"\bI'll\b": "I will",
-        r"\byou'll\b": "you will",
-        r"\bhe'll\b": "he will",
-        r"\bshe'll\b": "she will",
-        r"\bit'll\b": "it will",
-        r"\bwe'll\b": "we will",
-        r"\bthey'll\b": "they will",
-        r"\bthat'll\b": "that will",
-        
-        r"\bI've\b": "I have",
-        r"\byou've\b": "you have",
-        r"\bwe've\b": "we have",
-        r"\bthey've\b": "they have",
-        
-        r"\bI'd\b": "I would",
-        r"\byou'd\b": "you would",
-        r"\bhe'd\b": "he would",
-        r"\bshe'd\b": "she would",
-        r"\bwe'd\b": "we would",
-        r"\bthey'd\b": "they would",
-        r"\bthat'd\b": "that would",
-        
-        r"\by'all\b": "you all",
-    }
+    text = _ACRONYM_RE.sub(lambda m: _ACRONYM_LOOKUP[m.lastgroup], text)
     
-    for contraction, expansion in contractions.items():
-        text = re.sub(contraction, expansion, text, flags=re.IGNORECASE)
+    # Expand contractions that TTS struggles with (after acronyms, since
+    # FWIW expands to a contraction)
+    text = _CONTRACTION_RE.sub(lambda m: _CONTRACTION_LOOKUP[m.lastgroup], text)
     
     return text
 
+# clean_story patterns, compiled once at import
+_ORIGINAL_POST_RE = re.compile(r'Original post here: ?\\?\\?\[.*?\]\(.*?\)', re.IGNORECASE)
+_EDIT_RE = re.compile(r'Edit:.*', re.IGNORECASE)
+_TLDR_RE = re.compile(r'TL;DR:.*', re.IGNORECASE)
+_MD_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+_URL_RE = re.compile(r'https?://\S+')
+# Anything the regex passes above could match; plain text skips them all
+_NEEDS_REGEX_RE = re.compile(r'original post here:|edit:|tl;dr:|\[|https?://', re.IGNORECASE)
+# Markdown emphasis (*, _, and so **, __) is dropped and " becomes '
+_CHAR_TABLE = str.maketrans({'"': "'", '*': None, '_': None})
+
 def clean_story(text: str) -> str:
     """
     Clean Reddit story text - remove markdown, links, etc.
     Returns the ORIGINAL text (with contractions) for display/subtitles.
     """
-    # Remove 'Original post here: [link]' lines
-    text = re.sub(r'Original post here: ?\\?\\?\[.*?\]\(.*?\)', '', text, flags=re.IGNORECASE)
-    # Remove 'Edit:' and everything after (common for updates)
-    text = re.sub(r'Edit:.*', '', text, flags=re.IGNORECASE)
-    # Remove 'TL;DR:' and everything after (common for summaries)
-    text = re.sub(r'TL;DR:.*', '', text, flags=re.IGNORECASE)
-    # Remove markdown links [text](url)
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'\1', text)
-    # Remove URLs
-    text = re.sub(r'https?://\S+', '', text)
-    # Remove excessive newlines and whitespace
-    text = re.sub(r'\n+', '\n', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'\*\*|__|\*|_', '', text)
-    text = text.replace('"', "'")
-    text = text.strip()
-    return text
+    # Plain text (no links, edits or summaries) skips the regex passes
+    if _NEEDS_REGEX_RE.search(text):
+        # Remove 'Original post here: [link]' lines
+        text = _ORIGINAL_POST_RE.sub('', text)
+        # Remove 'Edit:' and everything after (common for updates)
+        text = _EDIT_RE.sub('', text)
+        # Remove 'TL;DR:' and everything after (common for summaries)
+        text = _TLDR_RE.sub('', text)
+        # Remove markdown links [text](url)
+        text = _MD_LINK_RE.sub(r'\1', text)
+        # Remove URLs
+        text = _URL_RE.sub('', text)
+    # Collapse newlines and other whitespace runs (split() also drops the
+    # ends); strip again since removed markdown can expose an edge space
+    text = ' '.join(text.split())
+    text = text.translate(_CHAR_TABLE)
+    return text.strip()
 
 def prepare_text_for_tts(text: str) -> str:
     """
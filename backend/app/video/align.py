@@ -0,0 +1,194 @@
+"""
+Forced alignment of a known transcript against narration audio.
+
+The narration is generated from the subtitle text, so the words are already
+known - only their timing is missing. A wav2vec2 CTC model scores every audio
+frame against every character and a Viterbi trellis finds the best monotonic
+path through the transcript, giving word boundaries without an ASR decode.
+"""
+import subprocess
+import threading
+
+import numpy as np
+import torch
+import torchaudio
+
+_BUNDLE = torchaudio.pipelines.WAV2VEC2_ASR_BASE_960H
+_LABELS = _BUNDLE.get_labels()  # ('-', '|', 'E', 'T', 'A', ...): blank, word separator, characters
+_DICTIONARY = {label: index for index, label in enumerate(_LABELS)}
+_BLANK_ID = 0
+_SEPARATOR_ID = _DICTIONARY["|"]
+
+# Device picked once at import; torchaudio's wav2vec2 also runs on Apple MPS
+if torch.cuda.is_available():
+    DEVICE = "cuda"
+elif torch.backends.mps.is_available():
+    DEVICE = "mps"
+else:
+    DEVICE = "cpu"
+
+# wav2vec2 attention memory grows with the square of the input length, so
+# emissions are computed over windows of this many seconds and concatenated
+EMISSION_WINDOW_SECONDS = 30
+
+# Largest frames x tokens trellis to build (float32: 4 bytes per cell).
+# Longer transcripts raise so the caller falls back to Whisper
+MAX_TRELLIS_CELLS = 50_000_000
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    """Load the wav2vec2 model on first use and keep it for later calls."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            print("📥 Loading wav2vec2 alignment model...")
+            _model = _BUNDLE.get_model().to(DEVICE).eval()
+        return _model
+
+
+def release_model():
+    """Free the cached alignment model."""
+    global _model
+    with _model_lock:
+        _model = None
+
+
+def _load_audio(audio_path: str) -> torch.Tensor:
+    """Decode audio to mono float32 at the model's sample rate via ffmpeg."""
+    cmd = [
+        'ffmpeg', '-v', 'error',
+        '-i', audio_path,
+        '-f', 'f32le',
+        '-ac', '1',
+        '-ar', str(int(_BUNDLE.sample_rate)),
+        'pipe:1'
+    ]
+    raw = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, check=True).stdout
+    return torch.from_numpy(np.frombuffer(raw, dtype=np.float32).copy()).unsqueeze(0)
+
+
+def _emissions(waveform: torch.Tensor) -> torch.Tensor:
+    """Per-frame log-probabilities over _LABELS, scored window by window."""
+    sample_rate = int(_BUNDLE.sample_rate)
+    window = EMISSION_WINDOW_SECONDS * sample_rate
+    total = waveform.size(1)
+    bounds = list(range(0, total, window))
+    # A tail shorter than a second is folded into the previous window: too
+    # few samples for the conv front end to produce frames
+    if len(bounds) > 1 and total - bounds[-1] < sample_rate:
+        bounds.pop()
+    bounds.append(total)
+
+    model = _get_model()
+    parts = []
+    with torch.inference_mode():
+        for start, end in zip(bounds, bounds[1:]):
+            emissions, _ = model(waveform[:, start:end].to(DEVICE))
+            parts.append(torch.log_softmax(emissions, dim=-1)[0].cpu())
+    return torch.cat(parts)
+
+
+def _trellis(emission: torch.Tensor, tokens: list) -> torch.Tensor:
+    """Best cumulative log-probability of reaching token j at frame t."""
+    num_frames = emission.size(0)
+    num_tokens = len(tokens)
+    token_ids = torch.tensor(tokens)
+
+    trellis = torch.zeros((num_frames, num_tokens))
+    trellis[1:, 0] = torch.cumsum(emission[1:, _BLANK_ID], 0)
+    trellis[0, 1:] = -float("inf")
+    if num_tokens > 1:
+        # The first token can't still be current when too few frames remain
+        trellis[-num_tokens + 1:, 0] = float("inf")
+
+    for t in range(num_frames - 1):
+        trellis[t + 1, 1:] = torch.maximum(
+            # Stay on the same token (emit blank)
+            trellis[t, 1:] + emission[t, _BLANK_ID],
+            # Advance to the next token
+            trellis[t, :-1] + emission[t, token_ids[1:]],
+        )
+    return trellis
+
+
+def _backtrack(trellis: torch.Tensor, emission: torch.Tensor, tokens: list) -> list:
+    """Walk the trellis back from the last frame; returns (token_index, frame) pairs."""
+    t, j = trellis.size(0) - 1, trellis.size(1) - 1
+    path = []
+    while j > 0:
+        if t == 0:
+            raise ValueError("Alignment failed: audio too short for transcript")
+        stayed = trellis[t - 1, j] + emission[t - 1, _BLANK_ID]
+        changed = trellis[t - 1, j - 1] + emission[t - 1, tokens[j]]
+        t -= 1
+        # Frame t belongs to token j either way: it was emitted here or
+        # is a blank while j is still current
+        path.append((j, t))
+        if changed > stayed:
+            j -= 1
+    return path[::-1]
+
+
+def align_words(audio_path: str, words: list) -> list:
+    """
+    Align known words to the audio they were spoken in.
+
+    Args:
+        audio_path: Narration audio file
+        words: Words of the transcript, in spoken order
+
+    Returns:
+        List of {"word", "start", "end"} dicts (seconds), one per input word
+    """
+    # Tokenize: uppercase letters and apostrophes, '|' before each word
+    # (the leading one absorbs the trellis start). token_words maps each
+    # token to the word it spells (-1 for separators)
+    tokens = [_SEPARATOR_ID]
+    token_words = [-1]
+    for index, word in enumerate(words):
+        chars = [_DICTIONARY[c] for c in word.upper() if c in _DICTIONARY and c not in "-|"]
+        if not chars:
+            continue  # Numerals/symbols only - timed from neighbours below
+        tokens.append(_SEPARATOR_ID)
+        token_words.append(-1)
+        tokens.extend(chars)
+        token_words.extend([index] * len(chars))
+
+    if len(tokens) == 1:
+        raise ValueError("No alignable characters in transcript")
+
+    waveform = _load_audio(audio_path)
+    emission = _emissions(waveform)
+
+    if emission.size(0) < len(tokens):
+        raise ValueError("Alignment failed: audio too short for transcript")
+    if emission.size(0) * len(tokens) > MAX_TRELLIS_CELLS:
+        raise ValueError("Alignment skipped: transcript too long to align in memory")
+
+    path = _backtrack(_trellis(emission, tokens), emission, tokens)
+    seconds_per_frame = waveform.size(1) / emission.size(0) / _BUNDLE.sample_rate
+
+    # Frame span of each word: first to last frame of any of its tokens
+    spans = {}
+    for token_index, frame in path:
+        word_index = token_words[token_index]
+        if word_index < 0:
+            continue
+        first, last = spans.get(word_index, (frame, frame))
+        spans[word_index] = (min(first, frame), max(last, frame))
+
+    timings = []
+    for index, word in enumerate(words):
+        if index in spans:
+            first, last = spans[index]
+            start, end = first * seconds_per_frame, (last + 1) * seconds_per_frame
+        else:
+            # Unalignable word: sits between the previous word and the next one
+            start = timings[-1]["end"] if timings else 0.0
+            following = next((spans[i][0] for i in range(index + 1, len(words)) if i in spans), None)
+            end = following * seconds_per_frame if following is not None else start
+        timings.append({"word": word, "start": start, "end": end})
+    return timings
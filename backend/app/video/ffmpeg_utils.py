@@ -1,188 +1,267 @@
+import os
 import subprocess
+from functools import lru_cache
 from pathlib import Path
-import json
 import random
+import re
 
+from app.video.subtitle_config import (
+    VIDEO_BITRATE_MAX,
+    VIDEO_CRF,
+    VIDEO_ENCODER,
+    VIDEO_PRESET,
+)
 
-def get_video_duration(video_path: str) -> float:
-    """Get video duration in seconds using ffprobe."""
+
+@lru_cache(maxsize=64)
+def _probe_video_cached(video_path: str, mtime_ns: int) -> dict:
+    """Run ffprobe once for duration and first video stream dimensions.
+    mtime_ns is part of the cache key so a replaced file is probed again."""
+    # Flat key=value lines (width=, height=, duration=) are all we need;
+    # no JSON document to build and parse
     cmd = [
         "ffprobe",
         "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "json",
+        "-select_streams", "v:0",
+        "-show_entries", "format=duration:stream=width,height",
+        "-of", "default=noprint_wrappers=1",
         video_path
     ]
-    result = subprocess.check_output(cmd)
-    data = json.loads(result)
-    return float(data["format"]["duration"])
+    result = subprocess.run(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+    info = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+    return {
+        "duration": float(info["duration"]),
+        "width": int(info["width"]),
+        "height": int(info["height"]),
+    }
+
+
+def probe_video(video_path: str) -> dict:
+    """Get duration, width and height of a video, cached per file version.
+    Base videos are reused across jobs, so after the first job this never
+    spawns ffprobe."""
+    return _probe_video_cached(video_path, os.stat(video_path).st_mtime_ns)
+
+
+def get_video_duration(video_path: str) -> float:
+    """Get video duration in seconds using ffprobe."""
+    return probe_video(video_path)["duration"]
 
 
 def get_video_dimensions(video_path: str) -> tuple:
     """Get video width and height using ffprobe."""
-    cmd = [
-        "ffprobe",
-        "-v", "error",
-        "-select_streams", "v:0",
-        "-show_entries", "stream=width,height",
-        "-of", "json",
-        video_path
-    ]
-    result = subprocess.check_output(cmd)
-    data = json.loads(result)
-    stream = data["streams"][0]
-    return int(stream["width"]), int(stream["height"])
+    info = probe_video(video_path)
+    return info["width"], info["height"]
 
 
-def merge_audio_with_video(base_video: str, audio_file: str, out_video: str, start_time: float = None, duration: float = None):
-    """Mute base video and overlay audio track, writing to out_video.
-    Automatically detects horizontal videos and applies 9:16 center crop for vertical format.
-    
-    Args:
-        start_time: Optional start time in seconds to begin video segment
-        duration: Optional duration in seconds for video segment
-    """
-    out = Path(out_video)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Get video dimensions to determine if cropping is needed
-    width, height = get_video_dimensions(base_video)
-    aspect_ratio = width / height
-    
+def _vertical_crop_filter(width: int, height: int):
+    """Center-crop filter that turns a video 9:16, or None if it already is.
+    Horizontal and square videos get cropped; vertical ones pass through."""
     # Target aspect ratio for vertical video (9:16)
     target_aspect = 9 / 16  # 0.5625
     
     # Determine if we need to crop (horizontal or square video)
-    needs_crop = aspect_ratio > target_aspect
+    if width / height <= target_aspect:
+        return None
     
-    cmd = ["ffmpeg", "-y"]
+    # Calculate crop dimensions for 9:16 aspect ratio (center crop)
+    # out_width:out_height = 9:16
+    # We want the maximum height, then calculate width
+    crop_height = height
+    crop_width = int(crop_height * target_aspect)
     
-    # Add start time if specified
-    if start_time is not None:
-        cmd.extend(["-ss", str(start_time)])
+    # If calculated width exceeds source width, use width as constraint
+    if crop_width > width:
+        crop_width = width
+        crop_height = int(crop_width / target_aspect)
     
-    cmd.extend(["-i", base_video, "-i", audio_file])
+    # Center crop position
+    crop_x = (width - crop_width) // 2
+    crop_y = (height - crop_height) // 2
     
-    # Add duration if specified
-    if duration is not None:
-        cmd.extend(["-t", str(duration)])
+    print(f"🎬 Auto-cropping {width}x{height} → {crop_width}x{crop_height} (center crop for 9:16)")
+    return f"crop={crop_width}:{crop_height}:{crop_x}:{crop_y}"
+
+
+@lru_cache(maxsize=16)
+def _atempo_chain(speed: float) -> str:
+    """atempo filter chain for a speed multiplier (each atempo only supports 0.5-2.0).
+    Cached: the speed comes from config, so every job asks for the same chain."""
+    audio_filters = []
+    remaining_speed = speed
+    if remaining_speed > 2.0:
+        while remaining_speed > 2.0:
+            audio_filters.append("atempo=2.0")
+            remaining_speed /= 2.0
+    elif remaining_speed < 0.5:
+        while remaining_speed < 0.5:
+            audio_filters.append("atempo=0.5")
+            remaining_speed /= 0.5
+    audio_filters.append(f"atempo={remaining_speed}")
+    return ",".join(audio_filters)
+
+
+# Hardware H.264 encoders to try, fastest first
+HW_ENCODERS = ("h264_nvenc", "h264_videotoolbox", "h264_vaapi")
+VAAPI_DEVICE = "/dev/dri/renderD128"
+
+
+def _encoder_works(encoder: str) -> bool:
+    """Encode a few blank frames to check an encoder is usable, not just compiled in"""
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", *_encoder_input_args(encoder),
+           "-f", "lavfi", "-i", "color=size=256x256:duration=0.1"]
+    if encoder == "h264_vaapi":
+        cmd.extend(["-vf", "format=nv12,hwupload"])
+    cmd.extend(["-c:v", encoder, "-f", "null", "-"])
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=30).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+@lru_cache(maxsize=1)
+def detect_video_encoder() -> str:
+    """Pick the H.264 encoder for final renders (probed once per process)."""
+    if VIDEO_ENCODER != "auto":
+        return VIDEO_ENCODER
     
-    if needs_crop:
-        # Calculate crop dimensions for 9:16 aspect ratio (center crop)
-        # out_width:out_height = 9:16
-        # We want the maximum height, then calculate width
-        crop_height = height
-        crop_width = int(crop_height * target_aspect)
-        
-        # If calculated width exceeds source width, use width as constraint
-        if crop_width > width:
-            crop_width = width
-            crop_height = int(crop_width / target_aspect)
-        
-        # Center crop position
-        crop_x = (width - crop_width) // 2
-        crop_y = (height - crop_height) // 2
-        
-        print(f"🎬 Auto-cropping {width}x{height} → {crop_width}x{crop_height} (center crop for 9:16)")
-        
-        from app.video.subtitle_config import VIDEO_CRF, VIDEO_PRESET
-        
-        cmd.extend([
-            "-vf", f"crop={crop_width}:{crop_height}:{crop_x}:{crop_y}",
-            "-c:v", "libx264",
-            "-preset", VIDEO_PRESET,  # Use config preset (now "veryfast")
-            "-crf", str(VIDEO_CRF),   # Use config CRF (now 23)
-            "-r", "30",  # Reduce to 30fps for lower processing requirements
-            "-c:a", "aac",
-            "-b:a", "128k",  # Reduced audio bitrate
-            "-map", "0:v:0",
-            "-map", "1:a:0",
-            "-shortest",
-            # Strip all metadata from source video
-            "-map_metadata", "-1",
-            "-fflags", "+bitexact",
-            str(out),
-        ])
-    else:
-        # Video is already vertical, just merge audio
-        print(f"✓ Video is already vertical {width}x{height}, merging audio only")
-        cmd.extend([
-            # Copy video stream, encode audio stream
-            "-c:v", "copy",
-            "-c:a", "aac",
-            "-map", "0:v:0",
-            "-map", "1:a:0",
-            "-shortest",
-            # Strip all metadata from source video
-            "-map_metadata", "-1",
-            "-fflags", "+bitexact",
-            str(out),
-        ])
+    try:
+        available = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True, text=True
+        ).stdout
+    except OSError:
+        return "libx264"
     
-    subprocess.check_call(cmd)
-    return str(out)
+    for encoder in HW_ENCODERS:
+        if encoder in available and _encoder_works(encoder):
+            print(f"🚀 Using hardware encoder {encoder}")
+            return encoder
+    return "libx264"
 
 
-import subprocess
-import os
-from pathlib import Path
+def _encoder_input_args(encoder: str) -> list:
+    """Global options an encoder needs before the inputs"""
+    if encoder == "h264_vaapi":
+        return ["-vaapi_device", VAAPI_DEVICE]
+    return []
+
+
+def _encoder_filters(encoder: str) -> list:
+    """Filters appended to the video chain to feed the encoder"""
+    if encoder == "h264_vaapi":
+        # Subtitles are drawn on the CPU; upload the finished frames
+        return ["format=nv12", "hwupload"]
+    return []
+
+
+def _video_encode_args(encoder: str) -> list:
+    """Final-quality video encode options for the given H.264 encoder"""
+    if encoder == "h264_nvenc":
+        return [
+            "-c:v", "h264_nvenc",
+            "-preset", "p4",
+            "-tune", "hq",
+            "-rc", "vbr",
+            "-cq", str(VIDEO_CRF),
+            "-b:v", "0",
+            "-maxrate", VIDEO_BITRATE_MAX,
+            "-bufsize", "4M",
+            "-pix_fmt", "yuv420p",
+            "-profile:v", "high",
+        ]
+    if encoder == "h264_videotoolbox":
+        return [
+            "-c:v", "h264_videotoolbox",
+            "-b:v", VIDEO_BITRATE_MAX,
+            "-pix_fmt", "yuv420p",
+            "-profile:v", "high",
+        ]
+    if encoder == "h264_vaapi":
+        return [
+            "-c:v", "h264_vaapi",
+            "-qp", str(VIDEO_CRF),
+            "-profile:v", "high",
+        ]
+    return [
+        "-c:v", "libx264",
+        "-preset", VIDEO_PRESET,  # Use config preset (now "veryfast" for low RAM)
+        "-crf", str(VIDEO_CRF),   # Use config CRF (now 23 for smaller files)
+        "-maxrate", VIDEO_BITRATE_MAX,  # Use config max bitrate (now 4M)
+        "-bufsize", "4M",  # Reduced from 16M → 8M → 4M for minimal RAM usage
+        "-pix_fmt", "yuv420p",
+        "-profile:v", "high",  # H.264 High profile for better compression
+        "-level", "4.0",
+    ]
+
 
-def format_ass_time(seconds):
-    """Convert seconds to ASS time format (H:MM:SS.CC)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    return f"{hours}:{minutes:02d}:{secs:05.2f}"
+# One ASS event line: start, end, text
+_DIALOGUE_FMT = "Dialogue: 0,%s,%s,Default,,0,0,0,,%s\n"
+
+def format_ass_time(us):
+    """Convert integer microseconds to ASS time format (H:MM:SS.CC)"""
+    # Integer math only: round to the nearest centisecond once, then divmod
+    centis = (us + 5_000) // 10_000
+    hours, centis = divmod(centis, 360_000)
+    minutes, centis = divmod(centis, 6_000)
+    secs, centis = divmod(centis, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+# One SRT event: index line, timing line, then text up to the blank line
+_SRT_EVENT_RE = re.compile(
+    r'^\s*\d+[ \t]*\n'
+    r'(\d+):(\d\d):(\d\d),(\d{3})\s*-->\s*(\d+):(\d\d):(\d\d),(\d{3})[^\n]*\n'
+    r'(.*?)(?=\n[ \t]*\n|\Z)',
+    re.DOTALL | re.MULTILINE
+)
 
 def parse_srt_for_drawtext(srt_path):
-    """Parse SRT file and return list of words with timing"""
-    words_with_timing = []
-    
+    """Parse SRT file and return list of words with timing (integer microseconds)"""
     with open(srt_path, 'r', encoding='utf-8') as f:
-        content = f.read().strip()
-    
-    # Split into subtitle blocks
-    blocks = content.split('\n\n')
-    
-    for block in blocks:
-        if not block.strip():
-            continue
-            
-        lines = block.strip().split('\n')
-        if len(lines) < 3:
-            continue
-        
-        # Parse timing line (format: 00:00:01,000 --> 00:00:02,500)
-        timing_line = lines[1]
-        start_str, end_str = timing_line.split(' --> ')
-        
-        # Convert to seconds
-        start_time = srt_time_to_seconds(start_str)
-        end_time = srt_time_to_seconds(end_str)
-        
-        # Get text (everything after timing line)
-        text = ' '.join(lines[2:])
-        
-        # Store word with timing
-        words_with_timing.append({
-            'word': text,
-            'start': start_time,
-            'end': end_time
-        })
+        content = f.read()
     
-    return words_with_timing
+    # One regex pass over the file instead of splitting blocks, lines and
+    # timestamps separately; multi-line text is joined with spaces
+    return [
+        {
+            'word': m.group(9).strip().replace('\n', ' '),
+            'start': (int(m.group(1)) * 3600_000_000 + int(m.group(2)) * 60_000_000
+                      + int(m.group(3)) * 1_000_000 + int(m.group(4)) * 1_000),
+            'end': (int(m.group(5)) * 3600_000_000 + int(m.group(6)) * 60_000_000
+                    + int(m.group(7)) * 1_000_000 + int(m.group(8)) * 1_000),
+        }
+        for m in _SRT_EVENT_RE.finditer(content)
+    ]
 
-def srt_time_to_seconds(time_str):
-    """Convert SRT time format to seconds"""
-    # Format: 00:00:01,000
-    time_part, ms_part = time_str.split(',')
-    h, m, s = map(int, time_part.split(':'))
-    ms = int(ms_part)
-    return h * 3600 + m * 60 + s + ms / 1000.0
+# ASS header with bold white text, black outline, and shadow - no background box
+# Color format: &HAABBGGRR (Alpha, Blue, Green, Red in hex)
+# &H00FFFFFF = white text, &H00000000 = black outline
+# BorderStyle=1 with Outline creates a strong black border around text
+# Shadow adds depth
+_ASS_HEADER_FMT = """[Script Info]
+Title: Generated Subtitles
+ScriptType: v4.00+
+PlayResX: %d
+PlayResY: %d
 
-def generate_ass_subtitles(words_with_timing, output_path, video_width=810, video_height=1440):
-    """Generate ASS subtitle file respecting the phrase groupings from SRT"""
-    
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,%d,&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,1,0,0,0,105,100,0,0,1,%d,%d,5,10,10,20,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+@lru_cache(maxsize=8)
+def _ass_header(video_width, video_height):
+    """ASS header for a frame size (built once per size)"""
     # Calculate font size based on video height (proportional scaling)
     # Base: 36pt for 854px height → ~60pt for 1440px height
     # Formula: (video_height / 854) * 36 ≈ 60 for 1440px
@@ -196,53 +275,29 @@ def generate_ass_subtitles(words_with_timing, output_path, video_width=810, vide
     scaled_outline = int((video_height / base_height) * base_outline)
     scaled_shadow = int((video_height / base_height) * base_shadow)
     
-    # ASS header with bold white text, black outline, and shadow - no background box
-    # Color format: &HAABBGGRR (Alpha, Blue, Green, Red in hex)
-    # &H00FFFFFF = white text, &H00000000 = black outline
-    # BorderStyle=1 with Outline creates a strong black border around text
-    # Shadow adds depth
-    ass_content = f"""[Script Info]
-Title: Generated Subtitles
-ScriptType: v4.00+
-PlayResX: {video_width}
-PlayResY: {video_height}
+    return _ASS_HEADER_FMT % (video_width, video_height, scaled_font_size, scaled_outline, scaled_shadow)
 
-[V4+ Styles]
-Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: Default,Arial,{scaled_font_size},&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,1,0,0,0,105,100,0,0,1,{scaled_outline},{scaled_shadow},5,10,10,20,1
-
-[Events]
-Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
-"""
-    
+def generate_ass_subtitles(words_with_timing, output_path, video_width=810, video_height=1440):
+    """Generate ASS subtitle file respecting the phrase groupings from SRT"""
     # Use the phrases exactly as they come from the SRT file
     # Each item in words_with_timing already represents a complete phrase
-    phrases = []
-    for word_data in words_with_timing:
-        phrases.append({
-            'start': word_data['start'],
-            'end': word_data['end'],
-            'text': word_data['word']  # This is actually the full phrase text from SRT
-        })
+    # ('word' is actually the full phrase text from SRT)
+    starts = [format_ass_time(phrase['start']) for phrase in words_with_timing]
     
-    # Add each phrase with timing
-    # Each phrase replaces the previous one by having consecutive timing
-    for i, phrase in enumerate(phrases):
-        start_time = format_ass_time(phrase['start'])
-        # Make each phrase last until the next one starts (no gaps)
-        if i < len(phrases) - 1:
-            end_time = format_ass_time(phrases[i + 1]['start'])
-        else:
-            end_time = format_ass_time(phrase['end'])
-        
-        text = phrase['text']
-        
-        # White text with bold styling
-        ass_content += f"Dialogue: 0,{start_time},{end_time},Default,,0,0,0,,{text}\n"
-    
-    # Write ASS file
+    # Write ASS file: header once, then one Dialogue line per phrase
+    # (written as we go rather than grown with += into one big string)
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(ass_content)
+        f.write(_ass_header(video_width, video_height))
+        
+        # Add each phrase with timing
+        # Each phrase replaces the previous one by having consecutive timing
+        last = len(starts) - 1
+        for i, phrase in enumerate(words_with_timing):
+            # Make each phrase last until the next one starts (no gaps)
+            end_time = starts[i + 1] if i < last else format_ass_time(phrase['end'])
+            
+            # White text with bold styling
+            f.write(_DIALOGUE_FMT % (starts[i], end_time, phrase['word']))
 
 def burn_text_overlay(video_path, srt_path, output_path, speed_multiplier=1.0):
     """
@@ -272,18 +327,15 @@ def burn_text_overlay(video_path, srt_path, output_path, speed_multiplier=1.0):
         video_filters.append(f"setpts=PTS/{speed_multiplier}")
         
         # Handle audio tempo (chain if > 2.0)
-        remaining_speed = speed_multiplier
-        while remaining_speed > 2.0:
-            audio_filters.append("atempo=2.0")
-            remaining_speed /= 2.0
-        while remaining_speed < 0.5:
-            audio_filters.append("atempo=0.5")
-            remaining_speed /= 0.5
-        audio_filters.append(f"atempo={remaining_speed}")
+        audio_filters.append(_atempo_chain(speed_multiplier))
+    
+    encoder = detect_video_encoder()
+    video_filters.extend(_encoder_filters(encoder))
     
     # Build ffmpeg command with high quality encoding
     cmd = [
         'ffmpeg', '-y',
+        *_encoder_input_args(encoder),
         '-i', video_path,
         '-vf', ','.join(video_filters),
     ]
@@ -295,18 +347,9 @@ def burn_text_overlay(video_path, srt_path, output_path, speed_multiplier=1.0):
         cmd.extend(['-c:a', 'copy'])  # Copy audio if no speed change
     
     # High quality video encoding settings
-    from app.video.subtitle_config import VIDEO_CRF, VIDEO_PRESET, VIDEO_BITRATE_MAX
-    
     cmd.extend([
-        '-c:v', 'libx264',
-        '-preset', VIDEO_PRESET,  # Use config preset (now "veryfast" for low RAM)
-        '-crf', str(VIDEO_CRF),   # Use config CRF (now 23 for smaller files)
-        '-maxrate', VIDEO_BITRATE_MAX,  # Use config max bitrate (now 4M)
-        '-bufsize', '4M',  # Reduced from 16M → 8M → 4M for minimal RAM usage
+        *_video_encode_args(encoder),
         '-r', '30',  # Reduce framerate from 60fps to 30fps (50% less data to process)
-        '-pix_fmt', 'yuv420p',
-        '-profile:v', 'high',  # H.264 High profile for better compression
-        '-level', '4.0',
         # Audio settings (if re-encoding)
         '-c:a', 'aac' if audio_filters else 'copy',
         '-b:a', '128k' if audio_filters else None,  # Reduced from 192k to 128k
@@ -320,3 +363,70 @@ def burn_text_overlay(video_path, srt_path, output_path, speed_multiplier=1.0):
     cmd = [c for c in cmd if c is not None]
     
     subprocess.check_call(cmd)
+
+
+def render_video(base_video: str, audio_file: str, srt_path: str, output_path: str,
+                 start_time: float = None, duration: float = None, speed_multiplier: float = 1.0):
+    """
+    Crop, add narration, burn subtitles and speed up in ONE video encode.
+    Replaces the old merge-audio-then-burn-subtitles pipeline, which
+    encoded the same frames twice (and lost quality twice).
+    
+    Args:
+        base_video: Background video path
+        audio_file: Narration audio path
+        srt_path: SRT subtitle file path
+        output_path: Output video path
+        start_time: Optional start time in seconds to begin video segment
+        duration: Optional duration in seconds for video segment (before speed-up)
+        speed_multiplier: If != 1.0, speeds up video and audio
+    """
+    out = Path(output_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Generate ASS subtitle file from the SRT phrases
+    ass_path = output_path.replace('.mp4', '.ass')
+    generate_ass_subtitles(parse_srt_for_drawtext(srt_path), ass_path)
+    
+    width, height = get_video_dimensions(base_video)
+    crop_filter = _vertical_crop_filter(width, height)
+    
+    # Subtitles are laid out for the cropped frame, so crop comes first
+    video_filters = [crop_filter] if crop_filter else []
+    video_filters.append(f"ass='{ass_path}'")
+    audio_filter = "anull"
+    if speed_multiplier != 1.0:
+        video_filters.append(f"setpts=PTS/{speed_multiplier}")
+        audio_filter = _atempo_chain(speed_multiplier)
+    encoder = detect_video_encoder()
+    video_filters.extend(_encoder_filters(encoder))
+    filter_complex = f"[0:v]{','.join(video_filters)}[v];[1:a]{audio_filter}[a]"
+    
+    cmd = ["ffmpeg", "-y", *_encoder_input_args(encoder)]
+    
+    # Seek and trim the base video as input options so the segment length
+    # is measured before the speed-up
+    if start_time is not None:
+        cmd.extend(["-ss", str(start_time)])
+    if duration is not None:
+        cmd.extend(["-t", str(duration)])
+    
+    cmd.extend(["-i", base_video, "-i", audio_file])
+    
+    cmd.extend([
+        "-filter_complex", filter_complex,
+        "-map", "[v]",
+        "-map", "[a]",
+        *_video_encode_args(encoder),
+        "-r", "30",
+        "-c:a", "aac",
+        "-b:a", "128k",
+        "-shortest",
+        # Strip all metadata from source video
+        "-map_metadata", "-1",
+        "-fflags", "+bitexact",
+        str(out),
+    ])
+    
+    subprocess.check_call(cmd)
+    return str(out)
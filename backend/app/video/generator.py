@@ -1,10 +1,11 @@
-from pathlib import Path
 import uuid
 import random
 import subprocess
-from app.video.tts import text_to_speech
-from app.video.ffmpeg_utils import merge_audio_with_video, burn_text_overlay, get_video_duration
-from app.video.srt import generate_srt_from_audio_and_text
+from concurrent.futures import ThreadPoolExecutor
+from app.video.tts import text_to_speech, cleanup_tts_memory
+from app.video.ffmpeg_utils import render_video, probe_video, _atempo_chain
+from app.video.srt import write_srt, warm_models
+from app.video.metadata_utils import add_youtube_shorts_metadata
 from app.video.subtitle_config import (
     VIDEO_SPEED_MULTIPLIER,
     NARRATE_TITLE,
@@ -12,10 +13,11 @@ from app.video.subtitle_config import (
     VIDEO_PRESET,
     VIDEO_BITRATE_MAX
 )
+from app.video.paths import BASE_VIDEOS, OUT_DIR
+from app.utils.text_cleaning import prepare_text_for_tts
 
-BASE_DIR = Path(__file__).resolve().parent / "media"
-BASE_VIDEOS = BASE_DIR / "base_videos"
-OUT_DIR = BASE_DIR / "generated_videos"
+# Runs ffprobe on the base video and loads the subtitle model while TTS is busy
+_background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="video-prep")
 
 
 def estimate_audio_duration(text: str, words_per_second: float = 2.5) -> float:
@@ -38,28 +40,12 @@ def speed_up_video(input_path: str, output_path: str, speed: float = 1.25):
     # Calculate audio tempo and video speed
     # For speed 1.25: video plays 1.25x faster, audio tempo increases by 1.25x
     video_speed = speed
-    audio_tempo = speed
     
     # Use ffmpeg to speed up both video and audio
     # -filter:v "setpts=PTS/speed" speeds up video
     # -filter:a "atempo=speed" speeds up audio (preserves pitch)
-    # atempo only supports 0.5-2.0, so we may need to chain multiple filters
-    
-    audio_filters = []
-    remaining_speed = audio_tempo
-    
-    # Chain atempo filters if speed > 2.0
-    while remaining_speed > 2.0:
-        audio_filters.append("atempo=2.0")
-        remaining_speed /= 2.0
-    
-    while remaining_speed < 0.5:
-        audio_filters.append("atempo=0.5")
-        remaining_speed /= 0.5
-    
-    audio_filters.append(f"atempo={remaining_speed}")
-    
-    audio_filter_str = ",".join(audio_filters)
+    # atempo only supports 0.5-2.0, so the shared helper chains filters
+    audio_filter_str = _atempo_chain(speed)
     
     cmd = [
         'ffmpeg', '-y',
@@ -114,9 +100,17 @@ def generate_video_from_text(text: str, base_video_name: str, job_id: str = None
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     
     # Track all intermediate files for cleanup (even on error)
-    intermediate_files = [out_audio, out_srt, out_temp, out_temp_final, out_temp_sped]
+    intermediate_files = (
+        out_audio, out_srt, out_temp, out_temp_final, out_temp_sped,
+        OUT_DIR / f"{job_id}.temp_final.ass"  # ASS subtitles written by render_video
+    )
     
     try:
+        # Probe the base video and warm the subtitle model in the
+        # background; TTS needs neither
+        probe_future = _background_executor.submit(probe_video, str(base_video))
+        _background_executor.submit(warm_models)
+        
         # 1) Prepend title to text if configured
         full_text = text
         if NARRATE_TITLE and story_title:
@@ -125,32 +119,31 @@ def generate_video_from_text(text: str, base_video_name: str, job_id: str = None
             print(f"🎙️ Will narrate title: '{story_title}'")
 
         # 2) Generate audio using TTS-optimized text (expanded contractions)
-        # text_to_speech() will preprocess text internally (expand contractions, etc.)
-        # We need to get the SAME preprocessed text for subtitles to match audio perfectly
-        from app.utils.text_cleaning import prepare_text_for_tts
+        # Preprocess once: the SAME text is spoken and used for subtitles so
+        # they match the audio perfectly
         tts_text = prepare_text_for_tts(full_text)  # This is what will be spoken
         
-        text_to_speech(full_text, str(out_audio), voice_type=voice_type)
+        text_to_speech(tts_text, str(out_audio), voice_type=voice_type, preprocessed=True)
         
         # Free up TTS memory immediately after generation
-        from app.video.tts import cleanup_tts_memory
         cleanup_tts_memory()
 
         # 3) Generate SRT with perfect timing based on actual audio duration
         # Use TTS-PREPROCESSED text (expanded contractions) for subtitles
         # This ensures Whisper timing matches subtitle text 1:1 (no complex mapping needed)
         # Example: Audio says "he is" → Whisper detects "he is" → Subtitles show "he is" ✅
-        srt_content = generate_srt_from_audio_and_text(
+        # Entries stream straight to the SRT file as they are formatted
+        write_srt(
             str(out_audio), 
             tts_text,  # Use expanded text to match what Whisper hears in the audio
-            speed_multiplier=VIDEO_SPEED_MULTIPLIER  # Adjust timing for speed-up
+            str(out_srt)
         )
-        with open(out_srt, 'w') as f:
-            f.write(srt_content)
 
         # 3) Calculate random start time for base video
         estimated_duration = estimate_audio_duration(text)
-        video_duration = get_video_duration(str(base_video))
+        # One cached ffprobe per base video (started before TTS);
+        # render_video reuses it for dimensions
+        video_duration = probe_future.result()["duration"]
         
         # Add some buffer to ensure we have enough video
         needed_duration = estimated_duration + 5  # 5 second buffer
@@ -165,38 +158,22 @@ def generate_video_from_text(text: str, base_video_name: str, job_id: str = None
             start_time = random.uniform(0, max_start)
             segment_duration = needed_duration
 
-        # 4) Merge audio with random segment of base video
-        merge_audio_with_video(str(base_video), str(out_audio), str(out_temp), start_time, segment_duration)
-
-        # 5) Burn in text captions AND speed up video in single pass (avoids double re-encoding)
-        # This preserves video quality by only re-encoding once
+        # 4) Crop a random segment of the base video, add the narration, burn
+        # in captions and speed up - all in a single encode
         if VIDEO_SPEED_MULTIPLIER != 1.0:
-            print(f"🎬 Burning subtitles and speeding up to {VIDEO_SPEED_MULTIPLIER}x in single pass...")
-            burn_text_overlay(str(out_temp), str(out_srt), str(out_temp_final), speed_multiplier=VIDEO_SPEED_MULTIPLIER)
-            video_to_finalize = out_temp_final
-        else:
-            burn_text_overlay(str(out_temp), str(out_srt), str(out_temp_final))
-            video_to_finalize = out_temp_final
-
-        # 6) Clean up large intermediate file BEFORE metadata step to free disk space
-        # The temp.mp4 is the largest file and no longer needed
-        try:
-            out_temp.unlink()  # Remove 154 MB temp video before metadata writing
-            
-            # Also clean up TTS chunk files if they exist
-            chunk_files = list(OUT_DIR.glob(f"{job_id}_chunk_*.wav"))
-            for chunk_file in chunk_files:
-                chunk_file.unlink()
-            
-            if chunk_files:
-                print(f"🗑️ Cleaned up temp file and {len(chunk_files)} TTS chunks to free disk space")
-            else:
-                print(f"🗑️ Cleaned up large temp file to free disk space")
-        except Exception as e:
-            print(f"Warning: Could not remove temp files: {e}")
-
-        # 7) Add YouTube Shorts optimized metadata
-        from app.video.metadata_utils import add_youtube_shorts_metadata
+            print(f"🎬 Rendering with subtitles at {VIDEO_SPEED_MULTIPLIER}x in single pass...")
+        render_video(
+            str(base_video),
+            str(out_audio),
+            str(out_srt),
+            str(out_temp_final),
+            start_time,
+            segment_duration,
+            speed_multiplier=VIDEO_SPEED_MULTIPLIER
+        )
+        video_to_finalize = out_temp_final
+
+        # 5) Add YouTube Shorts optimized metadata
         add_youtube_shorts_metadata(
             str(video_to_finalize),
             str(out_final),
@@ -213,32 +190,16 @@ def generate_video_from_text(text: str, base_video_name: str, job_id: str = None
         print(f"🗑️ Cleaning up intermediate files for job {job_id}...")
         cleaned_count = 0
         
-        # Clean up all tracked intermediate files
+        # Clean up all tracked intermediate files (unlink directly rather
+        # than stat first - most of them exist)
         for file_path in intermediate_files:
-            if file_path.exists():
-                try:
-                    file_path.unlink()
-                    cleaned_count += 1
-                except Exception as e:
-                    print(f"   Warning: Could not delete {file_path.name}: {e}")
-        
-        # Clean up TTS chunk files
-        chunk_files = list(OUT_DIR.glob(f"{job_id}_chunk_*.wav"))
-        for chunk_file in chunk_files:
-            try:
-                chunk_file.unlink()
-                cleaned_count += 1
-            except Exception as e:
-                print(f"   Warning: Could not delete {chunk_file.name}: {e}")
-        
-        # Clean up ASS subtitle files
-        ass_file = OUT_DIR / f"{job_id}.temp_final.ass"
-        if ass_file.exists():
             try:
-                ass_file.unlink()
+                file_path.unlink()
                 cleaned_count += 1
+            except FileNotFoundError:
+                pass
             except Exception as e:
-                print(f"   Warning: Could not delete ASS file: {e}")
+                print(f"   Warning: Could not delete {file_path.name}: {e}")
         
         if cleaned_count > 0:
             print(f"   ✅ Cleaned up {cleaned_count} intermediate files")
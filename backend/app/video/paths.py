@@ -0,0 +1,10 @@
+"""
+Media directory locations for the video pipeline.
+Kept separate from generator.py so callers can resolve paths without
+importing the TTS/Whisper stack.
+"""
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent / "media"
+BASE_VIDEOS = BASE_DIR / "base_videos"
+OUT_DIR = BASE_DIR / "generated_videos"
@@ -6,8 +6,93 @@ Takes a raw audio file and optimizes it for XTTS v2.
 
 import subprocess
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Normalize loudness in-process when pyloudnorm is installed; otherwise
+# ffmpeg's loudnorm filter does it
+try:
+    import numpy as np
+    import pyloudnorm
+    import soundfile
+    PYLOUDNORM_AVAILABLE = True
+except ImportError:
+    PYLOUDNORM_AVAILABLE = False
+
+REFERENCE_SAMPLE_RATE = 22050  # XTTS v2 optimal
+TARGET_LOUDNESS = -16.0        # Integrated loudness (LUFS)
+TRUE_PEAK_LIMIT = -1.5         # dBFS
+LOUDNESS_BLOCK_SECONDS = 0.4   # BS.1770 gating block; pyloudnorm can't measure less
+# Source clip types picked up when a directory is given
+AUDIO_EXTENSIONS = frozenset({'.mp3', '.wav', '.m4a', '.flac', '.ogg'})
+
+def _audio_filter(name, **options):
+    """Format one ffmpeg filter, e.g. _audio_filter('loudnorm', I=-16) -> 'loudnorm=I=-16'."""
+    if not options:
+        return name
+    return f"{name}=" + ":".join(f"{key}={value}" for key, value in options.items())
+
+
+# Drop leading silence (applied to the reversed clip too, for trailing silence)
+_SILENCE_TRIM = _audio_filter('silenceremove', start_periods=1, start_silence=0.1, start_threshold='-50dB')
+
+# Remove silence at start, then (reversed) at end
+SILENCE_TRIM_FILTERS = ",".join([_SILENCE_TRIM, 'areverse', _SILENCE_TRIM, 'areverse'])
+
+# Silence trim and loudness normalization as one filter chain
+REFERENCE_AUDIO_FILTERS = ",".join([
+    SILENCE_TRIM_FILTERS,
+    # Normalize loudness for consistent volume
+    _audio_filter('loudnorm', I=int(TARGET_LOUDNESS), TP=TRUE_PEAK_LIMIT, LRA=11),
+])
+
+
+def _run_ffmpeg(cmd, input_path):
+    """Run ffmpeg with only errors logged; returns its stdout bytes."""
+    try:
+        return subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        print(f"❌ ffmpeg failed for {input_path}:\n{e.stderr.decode(errors='replace')}")
+        raise
+
+
+def _normalize_in_process(input_path, output_path, target_duration):
+    """
+    Trim silence and duration with ffmpeg, then normalize loudness with
+    pyloudnorm (BS.1770) on the decoded samples. For a few seconds of
+    audio this is far lighter than ffmpeg's loudnorm filter.
+    
+    Returns:
+        False (nothing written) if the trimmed clip is shorter than one
+        loudness block, e.g. mostly silence; True otherwise
+    """
+    raw = _run_ffmpeg([
+        'ffmpeg', '-loglevel', 'error', '-nostats',
+        '-i', input_path,
+        '-af', SILENCE_TRIM_FILTERS,
+        '-t', str(target_duration),
+        '-ar', str(REFERENCE_SAMPLE_RATE),
+        '-ac', '1',
+        '-f', 'f32le',
+        'pipe:1'
+    ], input_path)
+    samples = np.frombuffer(raw, dtype=np.float32).astype(np.float64)
+    if len(samples) < LOUDNESS_BLOCK_SECONDS * REFERENCE_SAMPLE_RATE:
+        return False
+    
+    measured = pyloudnorm.Meter(REFERENCE_SAMPLE_RATE).integrated_loudness(samples)
+    if np.isfinite(measured):
+        samples = pyloudnorm.normalize.loudness(samples, measured, TARGET_LOUDNESS)
+    # Keep peaks under the limit (loudnorm's TP) so the 16-bit WAV can't clip
+    peak_limit = 10 ** (TRUE_PEAK_LIMIT / 20)
+    peak = np.abs(samples).max(initial=0.0)
+    if peak > peak_limit:
+        samples *= peak_limit / peak
+    
+    soundfile.write(output_path, samples, REFERENCE_SAMPLE_RATE, subtype='PCM_16')
+    return True
+
+
 def optimize_reference_audio(input_path, output_path, target_duration=8.0):
     """
     Optimize audio file for voice cloning:
@@ -19,75 +104,60 @@ def optimize_reference_audio(input_path, output_path, target_duration=8.0):
     6. Trim or extend to target duration
     """
     
-    temp_dir = Path(output_path).parent / "temp"
-    temp_dir.mkdir(exist_ok=True)
-    
-    step1 = temp_dir / "step1_cleaned.wav"
-    step2 = temp_dir / "step2_normalized.wav"
-    step3 = temp_dir / "step3_trimmed.wav"
-    
-    print("🎙️ Step 1: Cleaning and converting audio...")
-    # Clean, convert to mono, set sample rate
-    subprocess.run([
-        'ffmpeg', '-y',
-        '-i', input_path,
-        '-af', 'silenceremove=start_periods=1:start_silence=0.1:start_threshold=-50dB,areverse,silenceremove=start_periods=1:start_silence=0.1:start_threshold=-50dB,areverse',
-        '-ar', '22050',
-        '-ac', '1',
-        '-acodec', 'pcm_s16le',
-        str(step1)
-    ], check=True)
-    
-    print("🎚️ Step 2: Normalizing volume...")
-    # Normalize to -3dB for consistent volume
-    subprocess.run([
-        'ffmpeg', '-y',
-        '-i', str(step1),
-        '-af', 'loudnorm=I=-16:TP=-1.5:LRA=11',
-        '-ar', '22050',
-        '-ac', '1',
-        str(step2)
-    ], check=True)
-    
-    print("✂️ Step 3: Trimming to optimal duration...")
-    # Trim to target duration (8 seconds is optimal for XTTS v2)
-    subprocess.run([
-        'ffmpeg', '-y',
-        '-i', str(step2),
-        '-t', str(target_duration),
-        '-ar', '22050',
-        '-ac', '1',
-        str(step3)
-    ], check=True)
-    
-    print("💾 Step 4: Saving final optimized audio...")
-    # Save as high-quality WAV (better than MP3 for voice cloning)
-    subprocess.run([
-        'ffmpeg', '-y',
-        '-i', str(step3),
-        '-acodec', 'pcm_s16le',
-        '-ar', '22050',
-        '-ac', '1',
-        output_path
-    ], check=True)
-    
-    # Cleanup temp files
-    print("🧹 Cleaning up temporary files...")
-    for temp_file in [step1, step2, step3]:
-        if temp_file.exists():
-            temp_file.unlink()
-    temp_dir.rmdir()
+    print("🎙️ Cleaning, normalizing and trimming audio...")
+    # Clips too short for pyloudnorm go through ffmpeg's loudnorm instead
+    if not (PYLOUDNORM_AVAILABLE and _normalize_in_process(input_path, output_path, target_duration)):
+        # Silence trim, loudness normalization and duration trim run as one
+        # filter chain in a single ffmpeg pass - no intermediate WAVs on disk.
+        # Only errors are logged, and stderr is captured rather than
+        # inherited so parallel runs can't interleave or stall on a full pipe
+        _run_ffmpeg([
+            'ffmpeg', '-y',
+            '-loglevel', 'error', '-nostats',
+            '-i', input_path,
+            '-af', REFERENCE_AUDIO_FILTERS,
+            # Trim to target duration (8 seconds is optimal for XTTS v2)
+            '-t', str(target_duration),
+            # Save as high-quality WAV (better than MP3 for voice cloning)
+            '-ar', str(REFERENCE_SAMPLE_RATE),
+            '-ac', '1',
+            '-acodec', 'pcm_s16le',
+            output_path
+        ], input_path)
     
     print(f"✅ Optimized reference audio saved to: {output_path}")
     print(f"📊 Audio specs: 22050Hz, mono, {target_duration}s duration")
     return output_path
 
 
+def optimize_reference_audios(files, target_duration=8.0, max_workers=None):
+    """
+    Optimize several clips concurrently, one ffmpeg process per clip.
+    Each clip is a single ffmpeg pass writing straight to its own output,
+    so runs can't collide; threads are enough since ffmpeg does the work.
+    
+    Args:
+        files: List of (input_path, output_path) pairs
+        target_duration: Duration of each output in seconds
+        max_workers: Concurrent ffmpeg processes (default: CPU count)
+    
+    Returns:
+        List of output paths, in input order
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(optimize_reference_audio, input_path, output_path, target_duration)
+            for input_path, output_path in files
+        ]
+        return [future.result() for future in futures]
+
+
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) < 2:
         print("Usage: python prepare_reference_audio.py <input_audio_file> [output_file] [duration]")
+        print("       python prepare_reference_audio.py <input_dir> [output_dir] [duration]")
         print("Example: python prepare_reference_audio.py my_voice.mp3 optimized_reference.wav 8.0")
         sys.exit(1)
     
@@ -99,4 +169,14 @@ if __name__ == "__main__":
         print(f"❌ Error: Input file '{input_file}' not found")
         sys.exit(1)
     
-    optimize_reference_audio(input_file, output_file, duration)
+    if os.path.isdir(input_file):
+        # Directory of clips: optimize them all in parallel
+        output_dir = Path(sys.argv[2] if len(sys.argv) > 2 else "optimized_references")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        clips = sorted(p for p in Path(input_file).iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS)
+        optimize_reference_audios(
+            [(str(clip), str(output_dir / f"{clip.stem}.wav")) for clip in clips],
+            duration
+        )
+    else:
+        optimize_reference_audio(input_file, output_file, duration)
@@ -1,22 +1,207 @@
 from pathlib import Path
-from typing import List
-import subprocess
-import re
 import gc
+import io
+import os
+import subprocess
+import threading
+from functools import lru_cache
 import torch
-import whisper
 from app.video.subtitle_config import (
     WORDS_PER_SUBTITLE_MIN,
     WORDS_PER_SUBTITLE_MAX,
     WHISPER_MODEL,
-    BREAK_PUNCTUATION,
-    VIDEO_SPEED_MULTIPLIER
+    WHISPER_COMPUTE_TYPE,
+    WHISPER_COMPUTE_TYPE_GPU,
+    BREAK_PUNCTUATION_SET
 )
 
+# Prefer WhisperX (batched faster-whisper/CTranslate2 + wav2vec2 forced
+# alignment); fall back to OpenAI Whisper's DTW word timestamps
+try:
+    import whisperx
+    WHISPERX_AVAILABLE = True
+except ImportError:
+    import whisper
+    WHISPERX_AVAILABLE = False
+
+# Align the known subtitle text directly when torchaudio is available
+try:
+    from app.video import align
+    from app.video.align import align_words
+    FORCED_ALIGNMENT_AVAILABLE = True
+except ImportError:
+    FORCED_ALIGNMENT_AVAILABLE = False
+
+# Batch size for WhisperX transcription
+WHISPERX_BATCH_SIZE = 16
+
+# Device picked once at import. No MPS here: CTranslate2 (WhisperX) only
+# runs on CUDA or CPU; the wav2vec2 aligner picks its own device
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+# WhisperX weight precision per device
+WHISPERX_COMPUTE_TYPES = {
+    "cuda": WHISPER_COMPUTE_TYPE_GPU,
+    "cpu": WHISPER_COMPUTE_TYPE,
+}
+
+# Loaded once and reused across calls; freed with release_models()
+_whisper_model = None
+_align_model = None
+_align_metadata = None
+_model_lock = threading.Lock()
+
+
+def _get_whisper_model():
+    """Load the transcription model on first use and keep it for later calls."""
+    global _whisper_model
+    with _model_lock:
+        if _whisper_model is None:
+            print(f"📥 Loading Whisper model '{WHISPER_MODEL}'...")
+            if WHISPERX_AVAILABLE:
+                _whisper_model = whisperx.load_model(
+                    WHISPER_MODEL,
+                    DEVICE,
+                    compute_type=WHISPERX_COMPUTE_TYPES[DEVICE],
+                    language="en",
+                    threads=os.cpu_count() if DEVICE == "cpu" else 4
+                )
+            else:
+                _whisper_model = whisper.load_model(WHISPER_MODEL)
+        return _whisper_model
+
+
+def _get_align_model():
+    """Load the WhisperX wav2vec2 alignment model on first use."""
+    global _align_model, _align_metadata
+    with _model_lock:
+        if _align_model is None:
+            _align_model, _align_metadata = whisperx.load_align_model(language_code="en", device=DEVICE)
+        return _align_model, _align_metadata
+
+
+def warm_models():
+    """
+    Load the subtitle timing model ahead of first use, so the load can
+    overlap other work (e.g. TTS). Only on GPU: on CPU the load would
+    compete for the cores the caller is using.
+    """
+    if DEVICE != "cuda":
+        return
+    try:
+        if FORCED_ALIGNMENT_AVAILABLE:
+            align._get_model()
+        else:
+            _get_whisper_model()
+    except Exception as e:
+        # The real call retries the load and falls back as usual
+        print(f"⚠️ Subtitle model warmup failed: {e}")
+
+
+def release_models():
+    """Free the cached Whisper/alignment models (call when a batch is done)."""
+    global _whisper_model, _align_model, _align_metadata
+    if FORCED_ALIGNMENT_AVAILABLE:
+        align.release_model()
+    with _model_lock:
+        _whisper_model = None
+        _align_model = None
+        _align_metadata = None
+    if DEVICE == "cuda":
+        torch.cuda.empty_cache()
+    gc.collect()
+    print("🗑️ Whisper model memory freed")
+
+
+def _transcribe_words(audio_path):
+    """
+    Transcribe audio and return word-level timings.
+    
+    Returns:
+        List of {"word", "start", "end"} dicts in spoken order
+    """
+    model = _get_whisper_model()
+    
+    if WHISPERX_AVAILABLE:
+        audio = whisperx.load_audio(audio_path)
+        result = model.transcribe(audio, batch_size=WHISPERX_BATCH_SIZE, language="en")
+        
+        # Word timestamps come from forced alignment against the transcript
+        align_model, align_metadata = _get_align_model()
+        result = whisperx.align(
+            result["segments"],
+            align_model,
+            align_metadata,
+            audio,
+            DEVICE,
+            return_char_alignments=False
+        )
+    else:
+        # Transcribe with word-level timestamps
+        result = model.transcribe(
+            audio_path,
+            word_timestamps=True,
+            language="en"
+        )
+    
+    # Extract word-level timing. The aligner leaves tokens it can't place
+    # (e.g. numerals) without times; those inherit the previous word's end
+    words = []
+    last_end = 0.0
+    for segment in result.get("segments", []):
+        for word_info in segment.get("words", []):
+            start = word_info.get("start", last_end)
+            end = word_info.get("end", start)
+            words.append({
+                "word": word_info["word"].strip(),
+                "start": start,
+                "end": end
+            })
+            last_end = end
+    return words
+
+
+def _whisper_word_timings(audio_path, text_words):
+    """Time the subtitle words by transcribing the audio and pairing words 1:1."""
+    backend = "WhisperX" if WHISPERX_AVAILABLE else "Whisper"
+    print(f"🎯 Generating word-level timestamps with {backend}...")
+    
+    whisper_words = _transcribe_words(audio_path)
+    
+    print(f"📊 Whisper detected {len(whisper_words)} words in audio")
+    
+    # Map text words to Whisper timings
+    # Since text is preprocessed to match audio, this should be 1:1 or very close
+    word_timings = []
+    
+    for i, text_word in enumerate(text_words):
+        if i < len(whisper_words):
+            # Direct 1:1 mapping - text matches audio
+            word_timings.append({
+                "word": text_word,  # Use subtitle text word
+                "start": whisper_words[i]["start"],
+                "end": whisper_words[i]["end"]
+            })
+        else:
+            # If we run out of Whisper timings, estimate from last known timing
+            print(f"⚠️ Warning: Ran out of timing data at word {i+1}/{len(text_words)}")
+            if word_timings:
+                last_end = word_timings[-1]["end"]
+                word_timings.append({
+                    "word": text_word,
+                    "start": last_end + 0.1,
+                    "end": last_end + 0.6  # Estimate ~0.5s per word
+                })
+            else:
+                break
+    
+    return word_timings
+
 
 def generate_srt_from_audio_and_text(audio_path, text, speed_multiplier=1.0):
     """
-    Generate SRT subtitles with accurate word-level timing using Whisper.
+    Generate SRT subtitles with accurate word-level timing, by forced
+    alignment of the known text (or Whisper transcription as a fallback).
     
     Args:
         audio_path: Path to audio file
@@ -28,131 +213,228 @@ def generate_srt_from_audio_and_text(audio_path, text, speed_multiplier=1.0):
           This ensures perfect alignment between Whisper timing and subtitle text.
           Example: If audio says "he is", text should be "he is" (not "he's")
     """
+    buffer = io.StringIO()
+    _write_srt_to(audio_path, text, buffer)
+    return buffer.getvalue()
+
+
+def write_srt(audio_path, text, out_path):
+    """
+    Like generate_srt_from_audio_and_text, but writes each entry to
+    out_path as it is formatted instead of building the whole SRT string.
+    
+    Returns:
+        out_path
+    """
+    with open(out_path, "w", buffering=1 << 16) as fh:
+        _write_srt_to(audio_path, text, fh)
+    return out_path
+
+
+def _write_srt_to(audio_path, text, fh):
+    """Time the words of text against the audio and write the SRT to fh."""
+    text_words = text.strip().split()
+    print(f"📝 Subtitle text has {len(text_words)} words")
+    if not text_words:
+        return
+    
     try:
-        print("🎯 Generating word-level timestamps with Whisper...")
-        
-        # Load Whisper model
-        model = whisper.load_model(WHISPER_MODEL)
-        
-        # Transcribe with word-level timestamps
-        result = model.transcribe(
-            audio_path,
-            word_timestamps=True,
-            language="en"
-        )
-        
-        # Free up Whisper model memory immediately
-        del model
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-        gc.collect()
-        print("🗑️ Whisper model memory freed")
-        
-        # Extract word-level timing from Whisper
-        whisper_words = []
-        for segment in result.get("segments", []):
-            for word_info in segment.get("words", []):
-                whisper_words.append({
-                    "word": word_info["word"].strip(),
-                    "start": word_info["start"],
-                    "end": word_info["end"]
-                })
-        
-        print(f"📊 Whisper detected {len(whisper_words)} words in audio")
-        
-        # Split text into words (this should match Whisper 1:1 since text is preprocessed)
+        timings = _word_timings(audio_path, text_words)
+        print(f"✅ Mapped {len(timings)} words with timing")
+        _write_phrases(timings, fh)
+    except Exception as e:
+        print(f"❌ Error generating timed subtitles: {e}")
+        print("🔄 Falling back to estimation method...")
+        # Discard anything written before the failure
+        fh.seek(0)
+        fh.truncate()
+        _write_fallback(text_words, fh)
+
+
+def _audio_duration(audio_path):
+    """Audio duration in seconds via ffprobe."""
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "csv=p=0",
+            audio_path
+        ],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(result.stdout.strip())
+
+
+def _short_transcript_timings(audio_path, text_words):
+    """
+    Time a transcript that fits in a single phrase (e.g. a narrated title)
+    as one entry spanning the whole audio - one ffprobe instead of a
+    model pass. Returns None if the transcript is longer or the probe
+    fails.
+    """
+    if len(text_words) > WORDS_PER_SUBTITLE_MAX:
+        return None
+    try:
+        duration = _audio_duration(audio_path)
+    except (subprocess.CalledProcessError, ValueError, OSError):
+        return None
+    print("⏱️ Short transcript - timing it from the audio duration...")
+    # The whole transcript as a single "word", so it renders as one cue
+    return [{"word": " ".join(text_words), "start": 0.0, "end": duration}]
+
+
+def _known_text_timings(audio_path, text_words):
+    """
+    Time text_words without transcribing: from the audio duration for a
+    short transcript, else by forced alignment. Returns None if Whisper
+    is needed.
+    """
+    timings = _short_transcript_timings(audio_path, text_words)
+    if timings is not None:
+        return timings
+    
+    # The words are already known, so aligning them to the audio is
+    # enough - no need to transcribe. Whisper is the fallback.
+    if FORCED_ALIGNMENT_AVAILABLE:
+        try:
+            print("🎯 Aligning subtitle text to audio (wav2vec2 forced alignment)...")
+            return align_words(audio_path, text_words)
+        except Exception as e:
+            print(f"⚠️ Forced alignment failed ({e}), transcribing instead...")
+    return None
+
+
+def _word_timings(audio_path, text_words):
+    """Time text_words by forced alignment, or by Whisper if that fails."""
+    timings = _known_text_timings(audio_path, text_words)
+    if timings is not None:
+        return timings
+    return _whisper_word_timings(audio_path, text_words)
+
+
+def generate_srts_batch(items):
+    """
+    Generate SRT subtitles for several audio files at once.
+    
+    Every item is aligned first; the Whisper model is only loaded if some
+    item needs the transcription fallback, and then serves all of them
+    back to back.
+    
+    Args:
+        items: List of (audio_path, text) pairs, text as for
+               generate_srt_from_audio_and_text
+    
+    Returns:
+        List of SRT strings, one per item
+    """
+    results = [None] * len(items)
+    word_timings = [None] * len(items)
+    needs_whisper = []
+    
+    for n, (audio_path, text) in enumerate(items):
         text_words = text.strip().split()
         print(f"📝 Subtitle text has {len(text_words)} words")
         
         if not text_words:
-            return ""
+            results[n] = ""
+            continue
         
-        # Map text words to Whisper timings
-        # Since text is preprocessed to match audio, this should be 1:1 or very close
-        word_timings = []
-        
-        for i, text_word in enumerate(text_words):
-            if i < len(whisper_words):
-                # Direct 1:1 mapping - text matches audio
-                word_timings.append({
-                    "word": text_word,  # Use subtitle text word
-                    "start": whisper_words[i]["start"],
-                    "end": whisper_words[i]["end"]
-                })
-            else:
-                # If we run out of Whisper timings, estimate from last known timing
-                print(f"⚠️ Warning: Ran out of timing data at word {i+1}/{len(text_words)}")
-                if word_timings:
-                    last_end = word_timings[-1]["end"]
-                    word_timings.append({
-                        "word": text_word,
-                        "start": last_end + 0.1,
-                        "end": last_end + 0.6  # Estimate ~0.5s per word
-                    })
-                else:
-                    break
-        
-        print(f"✅ Mapped {len(word_timings)} words with timing")
-        
-        # Group words into phrases based on configuration
-        print(f"📦 Grouping words into {WORDS_PER_SUBTITLE_MIN}-{WORDS_PER_SUBTITLE_MAX} word phrases...")
-        srt_content = []
-        phrase_num = 1
-        i = 0
-        
-        while i < len(word_timings):
-            # Collect words for this phrase
-            phrase_words = []
-            phrase_start = word_timings[i]["start"]
-            phrase_end = word_timings[i]["end"]
-            
-            words_in_phrase = 0
-            
-            while i < len(word_timings) and words_in_phrase < WORDS_PER_SUBTITLE_MAX:
-                word_data = word_timings[i]
-                phrase_words.append(word_data["word"])
-                phrase_end = word_data["end"]
-                words_in_phrase += 1
-                i += 1
-                
-                # Break at punctuation if we have at least min_words
-                if words_in_phrase >= WORDS_PER_SUBTITLE_MIN:
-                    if word_data["word"][-1] in BREAK_PUNCTUATION:
-                        break
-            
-            # Create phrase subtitle
-            phrase_text = " ".join(phrase_words)
-            start_timestamp = format_timestamp(phrase_start)
-            end_timestamp = format_timestamp(phrase_end)
-            
-            srt_content.append(f"{phrase_num}")
-            srt_content.append(f"{start_timestamp} --> {end_timestamp}")
-            srt_content.append(phrase_text)
-            srt_content.append("")  # Empty line between entries
-            
-            phrase_num += 1
-        
-        print(f"✅ Generated {phrase_num - 1} subtitle phrases from {len(word_timings)} words")
-        return "\n".join(srt_content)
+        word_timings[n] = _known_text_timings(audio_path, text_words)
+        if word_timings[n] is None:
+            needs_whisper.append(n)
+    
+    for n in needs_whisper:
+        audio_path, text = items[n]
+        try:
+            word_timings[n] = _whisper_word_timings(audio_path, text.strip().split())
+        except Exception as e:
+            print(f"❌ Error generating timed subtitles: {e}")
+            print("🔄 Falling back to estimation method...")
+            results[n] = generate_srt_fallback(text)
+    
+    for n, timings in enumerate(word_timings):
+        if timings is None:
+            continue
+        try:
+            print(f"✅ Mapped {len(timings)} words with timing")
+            results[n] = _timings_to_srt(timings)
+        except Exception as e:
+            print(f"❌ Error generating timed subtitles: {e}")
+            print("🔄 Falling back to estimation method...")
+            results[n] = generate_srt_fallback(items[n][1])
+    
+    return results
+
+
+def _phrase_ends(words):
+    """
+    Split words into subtitle phrases: each phrase takes up to
+    WORDS_PER_SUBTITLE_MAX words, ending early at punctuation once it has
+    WORDS_PER_SUBTITLE_MIN.
+    
+    Returns:
+        Exclusive end index of each phrase in words
+    """
+    ends = []
+    count = 0
+    for i, word in enumerate(words):
+        count += 1
+        if count == WORDS_PER_SUBTITLE_MAX or (
+            count >= WORDS_PER_SUBTITLE_MIN and word[-1] in BREAK_PUNCTUATION_SET
+        ):
+            ends.append(i + 1)
+            count = 0
+    if count:
+        ends.append(len(words))
+    return ends
+
+
+def _timings_to_srt(word_timings):
+    """Group timed words into subtitle phrases and render them as SRT."""
+    buffer = io.StringIO()
+    _write_phrases(word_timings, buffer)
+    return buffer.getvalue()
+
+
+def _write_phrases(word_timings, fh):
+    """Group timed words into subtitle phrases and write them to fh as SRT."""
+    # Group words into phrases based on configuration
+    print(f"📦 Grouping words into {WORDS_PER_SUBTITLE_MIN}-{WORDS_PER_SUBTITLE_MAX} word phrases...")
+    words = [timing["word"] for timing in word_timings]
+    phrase_ends = _phrase_ends(words)
+    
+    phrase_start_index = 0
+    for phrase_num, phrase_end_index in enumerate(phrase_ends, 1):
+        phrase_text = " ".join(words[phrase_start_index:phrase_end_index])
+        start_timestamp = format_timestamp(word_timings[phrase_start_index]["start"])
+        end_timestamp = format_timestamp(word_timings[phrase_end_index - 1]["end"])
         
-    except Exception as e:
-        print(f"❌ Error generating timed subtitles: {e}")
-        print("🔄 Falling back to estimation method...")
-        return generate_srt_fallback(text)
+        # One write per entry; entries after the first start with the
+        # empty separator line
+        separator = "\n" if phrase_num > 1 else ""
+        fh.write(f"{separator}{phrase_num}\n{start_timestamp} --> {end_timestamp}\n{phrase_text}\n")
+        phrase_start_index = phrase_end_index
+    
+    print(f"✅ Generated {len(phrase_ends)} subtitle phrases from {len(word_timings)} words")
 
 
 def generate_srt_fallback(text):
     """
     Fallback SRT generation using estimation (used if Whisper fails).
     """
-    words = text.strip().split()
-    if not words:
-        return ""
-    
+    buffer = io.StringIO()
+    _write_fallback(text.strip().split(), buffer)
+    return buffer.getvalue()
+
+
+def _write_fallback(words, fh):
+    """Write an estimated-timing SRT (one word per entry) to fh."""
     # Simple estimation: 0.6 seconds per word
     word_duration = 0.6
     
-    srt_content = []
     current_time = 0.0
     
     for i, word in enumerate(words):
@@ -162,72 +444,31 @@ def generate_srt_fallback(text):
         start_timestamp = format_timestamp(start_time)
         end_timestamp = format_timestamp(end_time)
         
-        # Add SRT entry
-        srt_content.append(f"{i + 1}")
-        srt_content.append(f"{start_timestamp} --> {end_timestamp}")
-        srt_content.append(word)
-        srt_content.append("")  # Empty line between entries
+        # Add SRT entry (empty line between entries)
+        separator = "\n" if i else ""
+        fh.write(f"{separator}{i + 1}\n{start_timestamp} --> {end_timestamp}\n{word}\n")
         
         current_time = end_time
-    
-    return "\n".join(srt_content)
+
+
+@lru_cache(maxsize=65536)
+def _format_milliseconds(total_ms):
+    """Format integer milliseconds as an SRT timestamp (HH:MM:SS,mmm)."""
+    hours, rem = divmod(total_ms, 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    secs, milliseconds = divmod(rem, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
 
 
 def format_timestamp(seconds):
     """Convert seconds to SRT timestamp format (HH:MM:SS,mmm)."""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    milliseconds = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
-    """Generate SRT with perfect timing based on actual audio duration"""
-    # Get actual audio duration
-    total_duration = get_audio_duration(audio_file)
-    
-    # Split text into words
-    words = text.split()
-    
-    if not words:
-        return ""
-    
-    # Calculate timing weights for each word
-    word_weights = [classify_word_timing_weight(word) for word in words]
-    total_weight = sum(word_weights)
-    
-    # Distribute time proportionally based on weights
-    srt_content = ""
-    current_time = 0.0
-    
-    for i, (word, weight) in enumerate(zip(words, word_weights), 1):
-        # Calculate duration for this word
-        word_duration = (weight / total_weight) * total_duration
-        
-        # Ensure minimum duration for readability
-        word_duration = max(0.25, word_duration)
-        
-        # Calculate end time
-        end_time = current_time + word_duration
-        
-        # Format timestamps
-        start_timestamp = format_srt_time(current_time)
-        end_timestamp = format_srt_time(end_time)
-        
-        # Create SRT entry
-        srt_content += f"{i}\n{start_timestamp} --> {end_timestamp}\n{word}\n\n"
-        
-        # Update current time (add small gap between words)
-        current_time = end_time + 0.05  # 50ms gap between words
-    
-    return srt_content
+    # Truncate to whole milliseconds once, then integer divmods (cached:
+    # fallback timings and phrase boundaries repeat the same values)
+    return _format_milliseconds(int(seconds * 1000))
 
 
-def format_srt_time(seconds: float) -> str:
-    """Format time in SRT format (HH:MM:SS,mmm)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    milliseconds = int((seconds - int(seconds)) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+# Older name for format_timestamp
+format_srt_time = format_timestamp
 
 
 def chunk_text_to_srt(text: str, out_srt: str, words_per_caption: int = 1, speed_multiplier: float = 1.1):
@@ -264,9 +505,7 @@ def chunk_text_to_srt(text: str, out_srt: str, words_per_caption: int = 1, speed
                 ms = int((t - int(t)) * 1000)
                 return f"{h:02}:{m:02}:{s:02},{ms:03}"
             
-            fh.write(f"{idx}\n")
-            fh.write(f"{fmt(start)} --> {fmt(end)}\n")
-            fh.write(chunk + "\n\n")
+            fh.write(f"{idx}\n{fmt(start)} --> {fmt(end)}\n{chunk}\n\n")
             start = end + gap
     
     return out_srt
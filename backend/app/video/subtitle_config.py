@@ -24,9 +24,13 @@ WHISPER_MODEL = "tiny"  # Options: "tiny", "base", "small", "medium", "large"
                         # medium: excellent accuracy (5 GB RAM) - TOO MUCH
                         # Changed to "tiny" to minimize RAM usage
                         # Still accurate enough for clean narration audio
+WHISPER_COMPUTE_TYPE = "int8"          # WhisperX weights on CPU: int8 quarters RAM vs float32 at
+                                       # near-identical accuracy, enough headroom for "base"/"small"
+WHISPER_COMPUTE_TYPE_GPU = "int8_float16"  # WhisperX weights on CUDA (int8 weights, fp16 compute)
 
 # Break subtitle at these punctuation marks (if min words met)
 BREAK_PUNCTUATION = '.!?,;:'
+BREAK_PUNCTUATION_SET = frozenset(BREAK_PUNCTUATION)  # O(1) membership for the per-word check
 
 # Video speed settings
 VIDEO_SPEED_MULTIPLIER = 1.3  # Speed up final video (1.0 = normal, 1.25 = 25% faster, 1.5 = 50% faster)
@@ -44,11 +48,19 @@ VIDEO_PRESET = "veryfast"     # Encoding preset: ultrafast/veryfast/medium/slow
 VIDEO_BITRATE_MAX = "4M"      # Maximum video bitrate (higher = better quality, larger files)
                               # 4 Mbps keeps temp files small (~50-70 MB instead of 150 MB)
                               # Sufficient for 810x1440 after YouTube compression
+VIDEO_ENCODER = "auto"        # H.264 encoder for final renders: "auto" picks a working hardware
+                              # encoder (h264_nvenc, h264_videotoolbox, h264_vaapi) and falls
+                              # back to "libx264"; set a name explicitly to force one
 
 # Title narration settings
 NARRATE_TITLE = True            # Have TTS read the title at the beginning
 TITLE_PAUSE_AFTER = 0.5         # Pause after title (seconds) before story starts
 
+# TTS model settings
+TTS_HALF_PRECISION = True         # Run TTS inference under fp16 autocast on CUDA (ignored on CPU)
+TTS_INT8_CPU = False              # Dynamically quantize the XTTS GPT to int8 when running on CPU
+                                   # (~4x smaller weights, faster decode; A/B the voice before enabling)
+
 # Audio clarity settings
 AUDIO_ENHANCEMENT_LEVEL = "high"  # Options: "off", "low", "medium", "high", "extreme"
                                    # Higher = clearer/sharper but may sound more processed
@@ -1,29 +1,58 @@
+import io
 import os
+import re
 import subprocess
 from pathlib import Path
 import requests
 import json
 import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+
+# Let the CUDA caching allocator grow segments instead of fragmenting them;
+# only takes effect if set before torch is first imported
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "max_split_size_mb:128,expandable_segments:True")
 import torch
-from TTS.api import TTS
+
+from app.utils.text_cleaning import prepare_text_for_tts
+from app.video.subtitle_config import AUDIO_ENHANCEMENT_LEVEL, AUDIO_BITRATE, TTS_HALF_PRECISION, TTS_INT8_CPU
 
 # Voice cloning configuration
 VOICE_REFERENCE_PATH = os.path.join(os.path.dirname(__file__), "training", "training_audio.mp3")
 VOICE_TRAINING_DIR = os.path.join(os.path.dirname(__file__), "training")
 
+# XTTS speaker conditioning, persisted so restarts skip the reference encode
+CONDITIONING_CACHE_PATH = os.path.join(VOICE_TRAINING_DIR, "cond_latents.pt")
+
+# Audio files in VOICE_TRAINING_DIR that count as training samples
+TRAINING_AUDIO_EXTENSIONS = frozenset({'.mp3', '.wav', '.m4a'})
+
 def prepare_enhanced_reference_audio():
     """Prepare enhanced reference audio by combining multiple samples if available."""
-    training_files = []
+    training_entries = []
     
-    # Check for multiple training files
+    # Check for multiple training files (DirEntry keeps its stat for the mtime check)
     if os.path.exists(VOICE_TRAINING_DIR):
-        for file in os.listdir(VOICE_TRAINING_DIR):
-            if file.endswith(('.mp3', '.wav', '.m4a')) and file != 'combined_reference.mp3':
-                training_files.append(os.path.join(VOICE_TRAINING_DIR, file))
+        with os.scandir(VOICE_TRAINING_DIR) as entries:
+            training_entries = [
+                entry for entry in entries
+                if entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in TRAINING_AUDIO_EXTENSIONS
+                and entry.name != 'combined_reference.mp3'
+            ]
+    training_files = [entry.path for entry in training_entries]
     
     # If multiple files exist, combine them for better voice cloning
     if len(training_files) > 1:
         combined_path = os.path.join(VOICE_TRAINING_DIR, "combined_reference.mp3")
+        
+        # Reuse the combined file unless a training file is newer
+        newest_mtime = max(entry.stat().st_mtime for entry in training_entries)
+        if os.path.exists(combined_path) and os.path.getmtime(combined_path) >= newest_mtime:
+            return combined_path
+        
         print(f"🎯 Combining {len(training_files)} training files for enhanced voice cloning...")
         
         # Create input list for ffmpeg
@@ -41,7 +70,7 @@ def prepare_enhanced_reference_audio():
             filter_complex = f"{''.join(filter_parts)}concat=n={len(training_files)}:v=0:a=1[out]"
         
         ffmpeg_cmd = [
-            'ffmpeg', '-y'
+            'ffmpeg', '-y', '-loglevel', 'error', '-nostats'
         ] + input_list + [
             '-filter_complex', filter_complex,
             '-map', '[out]',
@@ -53,49 +82,117 @@ def prepare_enhanced_reference_audio():
         ]
         
         try:
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+            result = subprocess.run(ffmpeg_cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, text=True)
             if result.returncode == 0:
                 print(f"✅ Enhanced reference audio created: {combined_path}")
                 return combined_path
+            print(f"⚠️ Failed to combine training files: {result.stderr}")
         except Exception as e:
             print(f"⚠️ Failed to combine training files: {e}")
     
     # Return original reference if combination failed or only one file
     return VOICE_REFERENCE_PATH if os.path.exists(VOICE_REFERENCE_PATH) else None
 
-# Initialize XTTS v2 for voice cloning
-try:
-    print("🎤 Loading XTTS v2 for voice cloning...")
-    tts_model = TTS(model_name="tts_models/multilingual/multi-dataset/xtts_v2", progress_bar=True)
-    print("✅ XTTS v2 loaded successfully for voice cloning!")
+def _quantize_gpt_int8(xtts):
+    """
+    Dynamically quantize the XTTS GPT's linear layers to int8 (CPU only).
+    Its GPT-2 blocks use transformers' Conv1D (a transposed Linear), so
+    those are swapped for nn.Linear first; the HiFi-GAN decoder is left alone.
+    """
+    from transformers.pytorch_utils import Conv1D
     
-    # Prepare enhanced reference audio
-    enhanced_reference = prepare_enhanced_reference_audio()
-    if enhanced_reference:
-        VOICE_REFERENCE_PATH = enhanced_reference
-        print(f"🎯 Using enhanced reference audio: {VOICE_REFERENCE_PATH}")
+    def swap(module):
+        for name, child in module.named_children():
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = torch.nn.Linear(in_features, out_features)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(module, name, linear)
+            else:
+                swap(child)
     
-    VOICE_CLONING_AVAILABLE = True
-except Exception as e:
-    print(f"❌ Failed to load XTTS v2: {e}")
-    print("🔄 Falling back to VITS model...")
-    VOICE_CLONING_AVAILABLE = False
-    try:
-        tts_model = TTS(model_name="tts_models/en/ljspeech/vits", progress_bar=True)
-        print("✅ Coqui TTS (VITS) loaded successfully!")
-    except Exception as e2:
-        print(f"❌ Failed to load Coqui TTS VITS: {e2}")
-        print("🔄 Trying neural_hmm as fallback...")
+    swap(xtts.gpt)
+    # In place: the GPT's inference wrapper shares these blocks
+    torch.ao.quantization.quantize_dynamic(xtts.gpt, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    print("⚡ XTTS GPT quantized to int8")
+
+
+# TTS() loads models on the CPU; move them to the GPU when one is available
+TTS_DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+# Loaded on first use by _get_tts_model() - importing this module is cheap
+tts_model = None
+VOICE_CLONING_AVAILABLE = False
+_tts_model_loaded = False
+_tts_model_lock = threading.Lock()
+
+
+def _get_tts_model():
+    """
+    Load the TTS model on first use: XTTS v2 for voice cloning, falling
+    back to VITS, then neural_hmm. Returns None if none could be loaded.
+    """
+    global tts_model, VOICE_CLONING_AVAILABLE, _tts_model_loaded
+    with _tts_model_lock:
+        if _tts_model_loaded:
+            return tts_model
+        from TTS.api import TTS
+        
+        # Initialize XTTS v2 for voice cloning
         try:
-            tts_model = TTS(model_name="tts_models/en/ljspeech/neural_hmm", progress_bar=True)
-            print("✅ Coqui TTS (neural_hmm) loaded successfully!")
-        except Exception as e3:
-            print(f"❌ Failed to load any Coqui TTS model: {e3}")
-            print("🔄 Will fall back to gTTS for audio generation")
-            tts_model = None
+            print("🎤 Loading XTTS v2 for voice cloning...")
+            tts_model = TTS(model_name="tts_models/multilingual/multi-dataset/xtts_v2", progress_bar=True).to(TTS_DEVICE)
+            print("✅ XTTS v2 loaded successfully for voice cloning!")
+            
+            if TTS_INT8_CPU and TTS_DEVICE == "cpu":
+                _quantize_gpt_int8(tts_model.synthesizer.tts_model)
+            
+            VOICE_CLONING_AVAILABLE = True
+        except Exception as e:
+            print(f"❌ Failed to load XTTS v2: {e}")
+            print("🔄 Falling back to VITS model...")
+            VOICE_CLONING_AVAILABLE = False
+            try:
+                tts_model = TTS(model_name="tts_models/en/ljspeech/vits", progress_bar=True).to(TTS_DEVICE)
+                print("✅ Coqui TTS (VITS) loaded successfully!")
+            except Exception as e2:
+                print(f"❌ Failed to load Coqui TTS VITS: {e2}")
+                print("🔄 Trying neural_hmm as fallback...")
+                try:
+                    tts_model = TTS(model_name="tts_models/en/ljspeech/neural_hmm", progress_bar=True).to(TTS_DEVICE)
+                    print("✅ Coqui TTS (neural_hmm) loaded successfully!")
+                except Exception as e3:
+                    print(f"❌ Failed to load any Coqui TTS model: {e3}")
+                    print("🔄 Will fall back to gTTS for audio generation")
+                    tts_model = None
+        
+        _tts_model_loaded = True
+        return tts_model
+
+
+# Set once the (possibly combined) reference audio has been resolved
+_reference_resolved = False
 
 
-def text_to_speech(text: str, out_path: str, lang: str = "en", slow: bool = False, voice_type: str = "male"):
+def _get_reference_audio():
+    """
+    Path of the voice reference audio. The enhanced (combined) reference
+    is prepared on first use rather than at import.
+    """
+    global VOICE_REFERENCE_PATH, _reference_resolved
+    if not _reference_resolved:
+        enhanced_reference = prepare_enhanced_reference_audio()
+        if enhanced_reference:
+            VOICE_REFERENCE_PATH = enhanced_reference
+            print(f"🎯 Using enhanced reference audio: {VOICE_REFERENCE_PATH}")
+        _reference_resolved = True
+    return VOICE_REFERENCE_PATH
+
+
+def text_to_speech(text: str, out_path: str, lang: str = "en", slow: bool = False, voice_type: str = "male",
+                   preprocessed: bool = False):
     """
     Generate an mp3 audio file from text using XTTS v2 voice cloning or fallback TTS.
     
@@ -105,6 +202,7 @@ def text_to_speech(text: str, out_path: str, lang: str = "en", slow: bool = Fals
         lang: Language (kept for compatibility)
         slow: Slow speech (kept for compatibility)
         voice_type: Voice type preference (kept for compatibility)
+        preprocessed: True if text already went through prepare_text_for_tts
     
     Returns:
         str: Path to the generated audio file
@@ -114,19 +212,19 @@ def text_to_speech(text: str, out_path: str, lang: str = "en", slow: bool = Fals
         out.parent.mkdir(parents=True, exist_ok=True)
         
         # Preprocess text for TTS (expand contractions, handle Reddit patterns)
-        from app.utils.text_cleaning import prepare_text_for_tts
-        clean_text = prepare_text_for_tts(text)
+        clean_text = text if preprocessed else prepare_text_for_tts(text)
         
         # Generate speech using XTTS v2 voice cloning or fallback
-        if tts_model is None:
+        if _get_tts_model() is None:
             raise Exception("No TTS model loaded")
         
-        # Check if voice cloning is available and reference audio exists
-        if VOICE_CLONING_AVAILABLE and os.path.exists(VOICE_REFERENCE_PATH):
-            return generate_voice_cloned_speech(clean_text, out_path)
-        else:
-            print("🔄 Voice cloning not available, using standard TTS...")
-            return generate_standard_tts(clean_text, out_path)
+        try:
+            return _generate_speech(clean_text, out_path)
+        except torch.cuda.OutOfMemoryError:
+            # Return cached blocks to the driver and try once more
+            print("⚠️ CUDA out of memory during TTS, clearing cache and retrying...")
+            torch.cuda.empty_cache()
+            return _generate_speech(clean_text, out_path)
         
     except Exception as e:
         print(f"❌ Error in TTS generation: {e}")
@@ -136,12 +234,47 @@ def text_to_speech(text: str, out_path: str, lang: str = "en", slow: bool = Fals
         raise Exception(f"TTS generation failed: {e}")
 
 
+@contextmanager
+def _fast_infer():
+    """
+    Inference mode (no autograd bookkeeping), plus fp16 autocast on CUDA
+    when TTS_HALF_PRECISION is set. bf16 is not used: XTTS converts its
+    output to NumPy inside inference, which has no bfloat16.
+    """
+    with torch.inference_mode():
+        if TTS_HALF_PRECISION and torch.cuda.is_available():
+            with torch.autocast("cuda", dtype=torch.float16):
+                yield
+        else:
+            yield
+
+
+def _generate_speech(clean_text: str, out_path: str):
+    """Synthesize with voice cloning when a reference is available, else standard TTS."""
+    # Check if voice cloning is available and reference audio exists
+    if VOICE_CLONING_AVAILABLE and os.path.exists(_get_reference_audio()):
+        return generate_voice_cloned_speech(clean_text, out_path)
+    else:
+        print("🔄 Voice cloning not available, using standard TTS...")
+        return generate_standard_tts(clean_text, out_path)
+
+
+# Full garbage collection runs once per this many cleanup calls
+GC_INTERVAL = 5
+_cleanup_calls = 0
+
+
 def cleanup_tts_memory():
-    """Free up memory after TTS generation by forcing garbage collection"""
+    """
+    Free up memory after TTS generation. The CUDA cache is left to the
+    allocator (it is only emptied after an out-of-memory error), and the
+    garbage collector runs every GC_INTERVAL calls.
+    """
+    global _cleanup_calls
     try:
-        # Clear CUDA cache if available
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+        _cleanup_calls += 1
+        if _cleanup_calls % GC_INTERVAL:
+            return
         
         # Force garbage collection to free up RAM
         gc.collect()
@@ -151,9 +284,85 @@ def cleanup_tts_memory():
         print(f"⚠️ Warning: Could not cleanup TTS memory: {e}")
 
 
+# (reference path, mtime_ns) -> (gpt_cond_latent, speaker_embedding) for the current reference
+_conditioning = None
+
+
+def _xtts_conditioning():
+    """
+    XTTS speaker conditioning (GPT latent + speaker embedding) for the
+    reference voice. Kept in memory and in CONDITIONING_CACHE_PATH, and
+    recomputed only when the reference file changes.
+    """
+    global _conditioning
+    key = (VOICE_REFERENCE_PATH, os.stat(VOICE_REFERENCE_PATH).st_mtime_ns)
+    if _conditioning is not None and _conditioning[0] == key:
+        return _conditioning[1]
+    
+    xtts = tts_model.synthesizer.tts_model
+    latents = None
+    try:
+        saved = torch.load(CONDITIONING_CACHE_PATH, map_location=xtts.device)
+        if (saved["reference"], saved["mtime_ns"]) == key:
+            latents = (saved["gpt_cond_latent"], saved["speaker_embedding"])
+    except Exception:
+        pass  # Missing or unreadable - recompute below
+    
+    if latents is None:
+        print("🎯 Encoding reference voice...")
+        latents = _encode_reference(xtts)
+        try:
+            torch.save({
+                "reference": key[0],
+                "mtime_ns": key[1],
+                "gpt_cond_latent": latents[0],
+                "speaker_embedding": latents[1],
+            }, CONDITIONING_CACHE_PATH)
+        except OSError as e:
+            print(f"⚠️ Could not save voice conditioning cache: {e}")
+    
+    _conditioning = (key, latents)
+    return latents
+
+
+def _encode_reference(xtts):
+    """Run the XTTS speaker encoder over the reference audio."""
+    config = xtts.config
+    return xtts.get_conditioning_latents(
+        audio_path=[VOICE_REFERENCE_PATH],
+        gpt_cond_len=config.gpt_cond_len,
+        gpt_cond_chunk_len=config.gpt_cond_chunk_len,
+        max_ref_length=config.max_ref_len,
+        sound_norm_refs=config.sound_norm_refs
+    )
+
+
+def _xtts_synthesize(text: str, gpt_cond_latent, speaker_embedding):
+    """Run XTTS inference on one chunk with precomputed conditioning; returns the waveform."""
+    xtts = tts_model.synthesizer.tts_model
+    config = xtts.config
+    # Same sampling settings tts_to_file uses
+    with _fast_infer():
+        out = xtts.inference(
+            text,
+            "en",
+            gpt_cond_latent,
+            speaker_embedding,
+            temperature=config.temperature,
+            length_penalty=config.length_penalty,
+            repetition_penalty=config.repetition_penalty,
+            top_k=config.top_k,
+            top_p=config.top_p
+        )
+    # Autocast can leave the waveform in fp16
+    return out["wav"].astype("float32", copy=False)
+
+
 def generate_voice_cloned_speech(text: str, out_path: str) -> str:
     """Generate speech using XTTS v2 voice cloning with reference audio."""
     try:
+        _get_tts_model()
+        _get_reference_audio()
         print(f"🎭 Generating voice cloned speech using: {VOICE_REFERENCE_PATH}")
         print(f"   Voice cloning available: {VOICE_CLONING_AVAILABLE}")
         print(f"   TTS model: {tts_model.model_name if tts_model else 'None'}")
@@ -162,55 +371,47 @@ def generate_voice_cloned_speech(text: str, out_path: str) -> str:
         # Shorter chunks = better prosody, more natural speech, higher quality
         # Sweet spot for XTTS v2: 80-100 characters per chunk
         max_chunk_length = 90  # Reduced from 120 for even better quality
+        
+        # Reference voice encoding is cached across requests (tts_to_file
+        # would re-encode it for every chunk)
+        gpt_cond_latent, speaker_embedding = _xtts_conditioning()
+        
         if len(text) > max_chunk_length:
             print(f"🔄 Text is long ({len(text)} chars), splitting into chunks...")
             chunks = split_text_into_chunks(text, max_chunk_length)
-            audio_chunks = []
-            
+        else:
+            chunks = [text]
+        
+        # Raw samples are piped straight into the ffmpeg that concatenates
+        # (back to back, no gaps, for timing accuracy) and converts to MP3
+        # with enhanced voice processing - no WAVs on disk
+        encoder = _start_pcm_encoder(out_path, tts_model.synthesizer.output_sample_rate)
+        try:
+            writes = []
             for i, chunk in enumerate(chunks):
-                chunk_path = str(out_path).replace('.mp3', f'_chunk_{i}.wav')
                 print(f"🎙️ Generating cloned voice chunk {i+1}/{len(chunks)}...")
                 
-                # Use XTTS v2 voice cloning with careful timing
-                tts_model.tts_to_file(
-                    text=chunk,
-                    speaker_wav=VOICE_REFERENCE_PATH,
-                    language="en",
-                    file_path=chunk_path
-                )
-                audio_chunks.append(chunk_path)
-            
-            # Combine chunks with minimal gaps for timing accuracy
-            temp_output = str(out_path).replace('.mp3', '_temp.wav')
-            combine_audio_chunks_precise(audio_chunks, temp_output)
-            
-            # Clean up chunk files
-            for chunk_path in audio_chunks:
-                if os.path.exists(chunk_path):
-                    os.remove(chunk_path)
-        else:
-            # Create temporary path for XTTS output
-            temp_output = str(out_path).replace('.mp3', '_temp.wav')
-            
-            print(f"� Generating cloned voice...")
-            tts_model.tts_to_file(
-                text=text,
-                speaker_wav=VOICE_REFERENCE_PATH,
-                language="en", 
-                file_path=temp_output
-            )
-        
-        # Convert WAV to MP3 with enhanced voice processing for cloned voice
+                # Use XTTS v2 voice cloning with careful timing. The write
+                # runs on the writer thread (in order) so the next chunk
+                # starts generating while ffmpeg takes this one
+                wav = _xtts_synthesize(chunk, gpt_cond_latent, speaker_embedding)
+                writes.append(_pcm_writer.submit(_write_pcm, encoder, wav))
+            for write in writes:
+                write.result()
+        except BaseException:
+            encoder.kill()
+            encoder.wait()
+            raise
         print(f"🔧 Converting cloned voice to MP3 with processing...")
-        convert_to_mp3_with_processing(temp_output, out_path, voice_type="cloned")
-        
-        # Clean up temporary file
-        if os.path.exists(temp_output):
-            os.remove(temp_output)
+        _finish_pcm_encoder(encoder)
         
         print(f"✅ Voice cloned audio generated: {out_path}")
         return str(out_path)
         
+    except torch.cuda.OutOfMemoryError:
+        # Passed through unchanged so text_to_speech can clear the CUDA
+        # cache and retry
+        raise
     except Exception as e:
         print(f"❌ Voice cloning failed: {e}")
         import traceback
@@ -222,6 +423,7 @@ def generate_voice_cloned_speech(text: str, out_path: str) -> str:
 def generate_standard_tts(text: str, out_path: str) -> str:
     """Generate speech using standard TTS models (VITS, etc.)."""
     try:
+        _get_tts_model()
         # Check if model requires speaker parameter
         model_name = tts_model.model_name if hasattr(tts_model, 'model_name') else ""
         requires_speaker = 'multi' in model_name.lower() or tts_model.is_multi_speaker
@@ -240,41 +442,28 @@ def generate_standard_tts(text: str, out_path: str) -> str:
         if len(text) > max_chunk_length:
             print(f"🔄 Text is long ({len(text)} chars), splitting into chunks...")
             chunks = split_text_into_chunks(text, max_chunk_length)
-            audio_chunks = []
-            
-            for i, chunk in enumerate(chunks):
-                chunk_path = str(out_path).replace('.mp3', f'_chunk_{i}.wav')
-                print(f"🎙️ Generating chunk {i+1}/{len(chunks)}...")
-                if requires_speaker and speaker:
-                    tts_model.tts_to_file(text=chunk, file_path=chunk_path, speaker=speaker)
-                else:
-                    tts_model.tts_to_file(text=chunk, file_path=chunk_path)
-                audio_chunks.append(chunk_path)
-            
-            # Combine chunks
-            temp_output = str(out_path).replace('.mp3', '_temp.wav')
-            combine_audio_chunks(audio_chunks, temp_output)
-            
-            # Clean up chunk files
-            for chunk_path in audio_chunks:
-                if os.path.exists(chunk_path):
-                    os.remove(chunk_path)
         else:
-            # Create temporary path for TTS output
-            temp_output = str(out_path).replace('.mp3', '_temp.wav')
-            
             print(f"🎙️ Generating speech with standard TTS...")
-            if requires_speaker and speaker:
-                tts_model.tts_to_file(text=text, file_path=temp_output, speaker=speaker)
-            else:
-                tts_model.tts_to_file(text=text, file_path=temp_output)
+            chunks = [text]
         
-        # Convert WAV to MP3 with processing
-        convert_to_mp3_with_processing(temp_output, out_path, voice_type="standard")
+        # Chunks stay in memory as arrays (peak-normalized like the WAV
+        # writer did) instead of going through files and an ffmpeg concat
+        wavs = []
+        for i, chunk in enumerate(chunks):
+            if len(chunks) > 1:
+                print(f"🎙️ Generating chunk {i+1}/{len(chunks)}...")
+            with _fast_infer():
+                if requires_speaker and speaker:
+                    wav = tts_model.tts(text=chunk, speaker=speaker)
+                else:
+                    wav = tts_model.tts(text=chunk)
+            wavs.append(_peak_normalize(np.asarray(wav, dtype=np.float32)))
         
-        # Clean up temporary file
-        if os.path.exists(temp_output):
-            os.remove(temp_output)
+        # Convert to MP3 with processing. Joined chunks get the smoothing
+        # the chunk concat used to apply
+        pre_filters = "aresample=22050,volume=0.8,dynaudnorm=p=0.9" if len(wavs) > 1 else None
+        encoder = _start_pcm_encoder(out_path, tts_model.synthesizer.output_sample_rate, pre_filters)
+        _finish_pcm_encoder(encoder, np.concatenate(wavs).tobytes())
         
         print(f"✅ Standard TTS audio generated: {out_path}")
         return str(out_path)
@@ -284,10 +473,8 @@ def generate_standard_tts(text: str, out_path: str) -> str:
         raise
 
 
-def convert_to_mp3_with_processing(input_path: str, output_path: str, voice_type: str = "standard"):
-    """Convert WAV to MP3 with appropriate audio processing based on voice type."""
-    from app.video.subtitle_config import AUDIO_ENHANCEMENT_LEVEL, AUDIO_BITRATE
-    
+def _build_enhancement_filter_chain(level: str) -> str:
+    """Comma-joined ffmpeg audio filter chain for an AUDIO_ENHANCEMENT_LEVEL."""
     # Base filters for cleanup and quality
     base_filters = [
         "highpass=f=75",  # Remove deep rumble
@@ -297,7 +484,7 @@ def convert_to_mp3_with_processing(input_path: str, output_path: str, voice_type
     ]
     
     # Enhancement filters based on level
-    if AUDIO_ENHANCEMENT_LEVEL == "extreme":
+    if level == "extreme":
         clarity_filters = [
             "atempo=1.04",  # Slight speed for energy
             # Multi-band EQ for clarity with depth
@@ -319,7 +506,7 @@ def convert_to_mp3_with_processing(input_path: str, output_path: str, voice_type
             # Strong volume boost
             "volume=2.0",
         ]
-    elif AUDIO_ENHANCEMENT_LEVEL == "high":
+    elif level == "high":
         clarity_filters = [
             "atempo=1.02",  # Minimal speed adjustment
             # Balanced EQ with depth and warmth
@@ -340,7 +527,7 @@ def convert_to_mp3_with_processing(input_path: str, output_path: str, voice_type
             # Volume boost
             "volume=1.8",
         ]
-    elif AUDIO_ENHANCEMENT_LEVEL == "medium":
+    elif level == "medium":
         clarity_filters = [
             # Natural, cleaner processing
             "equalizer=f=150:width_type=h:width=2:g=2",      # Warmth
@@ -355,7 +542,7 @@ def convert_to_mp3_with_processing(input_path: str, output_path: str, voice_type
             "alimiter=limit=0.98:attack=5:release=50",
             "volume=1.5",
         ]
-    elif AUDIO_ENHANCEMENT_LEVEL == "low":
+    elif level == "low":
         clarity_filters = [
             # Minimal processing - just louder and clearer
             "equalizer=f=2000:width_type=h:width=2:g=1.5",   # Clarity
@@ -376,21 +563,75 @@ def convert_to_mp3_with_processing(input_path: str, output_path: str, voice_type
         "aresample=22050:resampler=soxr:precision=32",  # High quality resampling
         "alimiter=limit=0.99:attack=3:release=40"  # Final safety limiter
     ]
-    
-    ffmpeg_cmd = [
-        'ffmpeg', '-y',
-        '-i', input_path,
-        '-af', ','.join(ffmpeg_filters),
-        '-acodec', 'libmp3lame',
-        '-ar', '22050',
-        '-ac', '1',
-        '-b:a', '192k',  # Higher bitrate for better quality
-        str(output_path)
-    ]
-    
-    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise Exception(f"FFmpeg conversion failed: {result.stderr}")
+    return ','.join(ffmpeg_filters)
+
+
+# Filter chain for every enhancement level, built once at import
+ENHANCEMENT_LEVELS = ("off", "low", "medium", "high", "extreme")
+_FILTER_CHAINS = {level: _build_enhancement_filter_chain(level) for level in ENHANCEMENT_LEVELS}
+
+# Chain for the configured level (unknown levels get "off", as the builder does)
+_AUDIO_FILTER_CHAIN = _FILTER_CHAINS.get(AUDIO_ENHANCEMENT_LEVEL, _FILTER_CHAINS["off"])
+
+# MP3 output settings for the PCM encoder
+MP3_OUTPUT_ARGS = [
+    '-acodec', 'libmp3lame',
+    '-ar', '22050',
+    '-ac', '1',
+    '-b:a', '192k',  # Higher bitrate for better quality
+]
+
+
+def _peak_normalize(wav):
+    """Scale a float waveform to full scale, as the WAV writer did for each chunk."""
+    return (wav * (1.0 / max(0.01, float(abs(wav).max())))).astype("float32", copy=False)
+
+
+def _write_pcm(encoder: subprocess.Popen, wav):
+    """Feed one chunk's samples to a running PCM encoder."""
+    encoder.stdin.write(_peak_normalize(wav).tobytes())
+
+
+def _start_pcm_encoder(output_path: str, sample_rate: int, pre_filters: str = None) -> subprocess.Popen:
+    """
+    Start an ffmpeg that reads mono float32 PCM from stdin and writes the
+    processed MP3; write samples to its stdin, then _finish_pcm_encoder().
+    pre_filters run ahead of the enhancement chain.
+    """
+    audio_filters = _AUDIO_FILTER_CHAIN
+    if pre_filters:
+        audio_filters = f"{pre_filters},{audio_filters}"
+    return subprocess.Popen(
+        [
+            'ffmpeg', '-y',
+            '-loglevel', 'error', '-nostats',
+            '-f', 'f32le',
+            '-ar', str(sample_rate),
+            '-ac', '1',
+            '-i', 'pipe:0',
+            '-af', audio_filters,
+            *MP3_OUTPUT_ARGS,
+            str(output_path)
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+
+
+def _finish_pcm_encoder(encoder: subprocess.Popen, samples: bytes = None):
+    """Send any remaining samples, close the encoder's input and wait for the MP3."""
+    _, stderr = encoder.communicate(samples)
+    if encoder.returncode != 0:
+        raise Exception(f"FFmpeg conversion failed: {stderr.decode(errors='replace')}")
+
+
+# Feeds synthesized chunks to ffmpeg (one worker keeps them in order)
+_pcm_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-pcm-writer")
+
+# Text splitting patterns, compiled once at import
+_SENTENCE_RE = re.compile(r'([.!?]+)')
+_BOUNDARY_RE = re.compile(r'(\s+(?:and|but|or|so|yet|because|since|while|though|although|if|when|where|which|who)\s+|,\s*|;\s*|\s+-\s+)')
 
 
 def split_text_into_chunks(text: str, max_length: int = 100) -> list:
@@ -398,10 +639,8 @@ def split_text_into_chunks(text: str, max_length: int = 100) -> list:
     Split text into optimal chunks for TTS quality.
     Prioritizes natural speech boundaries: sentences > clauses > phrases.
     """
-    import re
-    
     # First split by sentences (periods, exclamation, question marks)
-    sentences = re.split(r'([.!?]+)', text)
+    sentences = _SENTENCE_RE.split(text)
     
     chunks = []
     current_chunk = ""
@@ -449,11 +688,9 @@ def split_text_into_chunks(text: str, max_length: int = 100) -> list:
 
 def split_at_natural_boundaries(text: str, max_length: int) -> list:
     """Split long text at natural speech boundaries (commas, conjunctions)."""
-    import re
-    
     # Split at commas, semicolons, dashes, conjunctions
     # Keep the delimiter with the preceding text
-    parts = re.split(r'(\s+(?:and|but|or|so|yet|because|since|while|though|although|if|when|where|which|who)\s+|,\s*|;\s*|\s+-\s+)', text)
+    parts = _BOUNDARY_RE.split(text)
     
     chunks = []
     current = ""
@@ -475,70 +712,12 @@ def split_at_natural_boundaries(text: str, max_length: int) -> list:
     return chunks
 
 
-def combine_audio_chunks_precise(chunk_paths: list, output_path: str):
-    """Combine multiple audio files with minimal gaps for precise timing."""
-    # Create a text file listing all chunks for ffmpeg
-    list_file = output_path.replace('.wav', '_list.txt')
-    with open(list_file, 'w') as f:
-        for chunk_path in chunk_paths:
-            f.write(f"file '{chunk_path}'\n")
-    
-    # Use ffmpeg to concatenate with minimal processing for timing accuracy
-    ffmpeg_cmd = [
-        'ffmpeg', '-y',
-        '-f', 'concat',
-        '-safe', '0',
-        '-i', list_file,
-        '-acodec', 'pcm_s16le',  # Preserve quality
-        '-ar', '22050',  # Match sample rate
-        output_path
-    ]
-    
-    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise Exception(f"Audio concatenation failed: {result.stderr}")
-    
-    # Clean up list file
-    if os.path.exists(list_file):
-        os.remove(list_file)
-
-
-def combine_audio_chunks(chunk_paths: list, output_path: str):
-    """Combine multiple audio files into one with smooth transitions."""
-    # Create a text file listing all chunks for ffmpeg
-    list_file = output_path.replace('.wav', '_list.txt')
-    with open(list_file, 'w') as f:
-        for chunk_path in chunk_paths:
-            f.write(f"file '{chunk_path}'\n")
-    
-    # Use ffmpeg to concatenate with crossfade for smoother transitions
-    ffmpeg_cmd = [
-        'ffmpeg', '-y',
-        '-f', 'concat',
-        '-safe', '0',
-        '-i', list_file,
-        # Add slight crossfade between chunks and normalize audio
-        '-af', 'aresample=22050,volume=0.8,dynaudnorm=p=0.9',
-        '-c:a', 'pcm_s16le',
-        output_path
-    ]
-    
-    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise Exception(f"Audio concatenation failed: {result.stderr}")
-    
-    # Clean up list file
-    if os.path.exists(list_file):
-        os.remove(list_file)
-
-
 def fallback_gtts(text: str, output_path: str, voice_type: str = 'male'):
     """
     Fallback to gTTS if Coqui TTS fails.
     """
     try:
         from gtts import gTTS
-        from app.utils.text_cleaning import prepare_text_for_tts
         
         # Preprocess text
         clean_text = prepare_text_for_tts(text)
@@ -546,14 +725,14 @@ def fallback_gtts(text: str, output_path: str, voice_type: str = 'male'):
         # Create TTS object with Australian English (sounds more male)
         tts = gTTS(text=clean_text, lang='en', tld='com.au', slow=False)
         
-        # Create temporary path
-        temp_output = output_path.replace('.mp3', '_temp.mp3')
-        tts.save(temp_output)
+        # Keep the gTTS mp3 in memory and pipe it to ffmpeg
+        buffer = io.BytesIO()
+        tts.write_to_fp(buffer)
         
         # Process with ffmpeg for consistent output
         ffmpeg_cmd = [
             'ffmpeg', '-y',
-            '-i', temp_output,
+            '-i', 'pipe:0',
             '-af', 'atempo=1.12',
             '-acodec', 'libmp3lame',
             '-ar', '24000',
@@ -562,13 +741,9 @@ def fallback_gtts(text: str, output_path: str, voice_type: str = 'male'):
             output_path
         ]
         
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        result = subprocess.run(ffmpeg_cmd, input=buffer.getvalue(), capture_output=True)
         if result.returncode != 0:
-            raise Exception(f"FFmpeg processing failed: {result.stderr}")
-        
-        # Clean up
-        if os.path.exists(temp_output):
-            os.remove(temp_output)
+            raise Exception(f"FFmpeg processing failed: {result.stderr.decode(errors='replace')}")
         
         print(f"✅ Fallback gTTS audio generated: {output_path}")
         return output_path
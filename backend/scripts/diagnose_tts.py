@@ -13,6 +13,8 @@ print("="*70)
 # Import the TTS module to trigger initialization
 print("\n1. Importing TTS module...")
 from app.video import tts
+tts._get_tts_model()  # Models load on first use
+tts._get_reference_audio()  # Resolve the (combined) reference as the first synthesis would
 
 print("\n2. Checking TTS Module State:")
 print(f"   VOICE_CLONING_AVAILABLE: {tts.VOICE_CLONING_AVAILABLE}")
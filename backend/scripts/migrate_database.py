@@ -62,6 +62,8 @@ def migrate_database(db_path: Path):
             'posted_at': "TIMESTAMP",
             'youtube_video_id': "VARCHAR",
             'upload_error': "TEXT",
+            'word_count': "INTEGER",
+            'title_word_count': "INTEGER",
             'created_at': "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
             'updated_at': "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
         }
@@ -77,11 +79,33 @@ def migrate_database(db_path: Path):
                 except sqlite3.OperationalError as e:
                     print(f"⚠️  Warning: {e}")
         
+        # Backfill word counts for rows stored before the column existed
+        cursor.execute("SELECT id, story FROM posts WHERE word_count IS NULL")
+        missing_counts = [
+            (len((story or "").split()), post_id)
+            for post_id, story in cursor.fetchall()
+        ]
+        if missing_counts:
+            print(f"🔢 Backfilling word_count for {len(missing_counts)} records")
+            cursor.executemany("UPDATE posts SET word_count = ? WHERE id = ?", missing_counts)
+        
+        cursor.execute("SELECT id, title FROM posts WHERE title_word_count IS NULL")
+        missing_title_counts = [
+            (len((title or "").split()), post_id)
+            for post_id, title in cursor.fetchall()
+        ]
+        if missing_title_counts:
+            print(f"🔢 Backfilling title_word_count for {len(missing_title_counts)} records")
+            cursor.executemany("UPDATE posts SET title_word_count = ? WHERE id = ?", missing_title_counts)
+        
         # Create indexes if they don't exist
         indexes = [
             ("ix_posts_posted", "posted"),
             ("ix_posts_score", "score"),
-            ("ix_posts_generation_status", "generation_status")
+            ("ix_posts_generation_status", "generation_status"),
+            ("ix_posts_word_count", "word_count"),
+            ("ix_posts_subreddit_score_words", "subreddit, score, word_count"),
+            ("ix_posts_score_words", "score, word_count, title_word_count")
         ]
         
         indexes_created = 0
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test that selecting posts for generation is a fixed number of queries
+(the selection plus the long-post count), however many posts it returns.
+"""
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.post import Post
+from app.services.video_service import VideoService
+
+
+def test_selection_query_count(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'posts.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        Post(reddit_id=f"p{i}", title="Title", story="story", score=1000 + i, word_count=100, title_word_count=1)
+        for i in range(20)
+    )
+    db.add(Post(reddit_id="long", title="Title", story="story", score=900, word_count=10_000, title_word_count=1))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    posts = VideoService().select_posts_for_generation(db, count=20)
+    for post in posts:
+        post.title, post.story, post.word_count  # Nothing left to lazy-load
+
+    assert len(posts) == 20
+    assert len(statements) == 2, statements
+    db.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_selection_query_count(Path(tmp))
+    print("✅ Generation selection runs in 2 queries")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Regression test: preprocess_for_tts must expand words whose case-insensitive
+match contains characters that don't lowercase back to the table entry
+(long s, dotless i, dotted capital I).
+"""
+
+from app.utils.text_cleaning import preprocess_for_tts
+
+CASES = [
+    ("ſo what", "significant other what"),
+    ("ıt's fine", "it is fine"),
+    ("dıdn't", "did not"),
+    ("İ'm here", "I am here"),
+    ("I'M here, DON'T go", "I am here, do not go"),
+]
+
+
+def test_unicode_case_folding():
+    for text, expected in CASES:
+        assert preprocess_for_tts(text) == expected, text
+
+
+if __name__ == "__main__":
+    test_unicode_case_folding()
+    print("✅ Unicode case-folding preprocessing OK")
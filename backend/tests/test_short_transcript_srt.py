@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Test that a transcript of up to WORDS_PER_SUBTITLE_MAX words (e.g. a
+narrated title) becomes a single SRT cue spanning the whole audio.
+"""
+
+from app.video import srt
+from app.video.subtitle_config import WORDS_PER_SUBTITLE_MAX
+
+
+def test_short_transcript_is_one_cue():
+    probe = srt._audio_duration
+    srt._audio_duration = lambda audio_path: 1.5
+    try:
+        # Punctuation after the minimum word count must not split the cue
+        words = ["Oh", "no.", "Why", "me", "today"][:WORDS_PER_SUBTITLE_MAX]
+        text = " ".join(words)
+        expected = f"1\n00:00:00,000 --> 00:00:01,500\n{text}\n"
+
+        assert srt.generate_srt_from_audio_and_text("title.mp3", text) == expected
+        assert srt.generate_srts_batch([("title.mp3", text)]) == [expected]
+    finally:
+        srt._audio_duration = probe
+
+
+if __name__ == "__main__":
+    test_short_transcript_is_one_cue()
+    print("✅ Short transcript produces one cue")
@@ -15,6 +15,7 @@ test_cases = [
     "I'm a 32F and my GF is 29F, we've been together 5 years",
     "AITA? I told my 45M coworker he shouldn't've done that",
     "IMO, y'all are overreacting. I'm 19F BTW",
+    "My **roommate** said \"_never_\" [here](https://redd.it/abc)\n\nTL;DR: she lied",
 ]
 
 print("=" * 80)
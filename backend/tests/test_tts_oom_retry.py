@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test that a CUDA out-of-memory error on the voice-cloning (XTTS) path
+reaches text_to_speech, which clears the CUDA cache and retries once.
+"""
+
+import types
+
+import numpy as np
+import torch
+
+from app.video import tts
+
+
+class _FakeEncoder:
+    """Stands in for the ffmpeg process fed by _start_pcm_encoder."""
+    def kill(self):
+        pass
+
+    def wait(self):
+        pass
+
+
+def test_cloned_path_retries_after_oom(tmp_path):
+    reference = tmp_path / "reference.mp3"
+    reference.write_bytes(b"")
+    calls = {"synthesize": 0, "empty_cache": 0}
+
+    def synthesize(chunk, gpt_cond_latent, speaker_embedding):
+        calls["synthesize"] += 1
+        if calls["synthesize"] == 1:
+            raise torch.cuda.OutOfMemoryError("CUDA out of memory")
+        return np.zeros(16, dtype=np.float32)
+
+    def empty_cache():
+        calls["empty_cache"] += 1
+
+    model = types.SimpleNamespace(
+        model_name="xtts_v2",
+        synthesizer=types.SimpleNamespace(output_sample_rate=24000)
+    )
+    patches = {
+        "_get_tts_model": lambda: model,
+        "tts_model": model,
+        "VOICE_CLONING_AVAILABLE": True,
+        "_get_reference_audio": lambda: str(reference),
+        "_xtts_conditioning": lambda: (None, None),
+        "_xtts_synthesize": synthesize,
+        "_start_pcm_encoder": lambda out_path, sample_rate, pre_filters=None: _FakeEncoder(),
+        "_write_pcm": lambda encoder, wav: None,
+        "_finish_pcm_encoder": lambda encoder, samples=None: None,
+    }
+    saved = {name: getattr(tts, name) for name in patches}
+    saved_empty_cache = torch.cuda.empty_cache
+    for name, value in patches.items():
+        setattr(tts, name, value)
+    torch.cuda.empty_cache = empty_cache
+    try:
+        out_path = str(tmp_path / "out.mp3")
+        assert tts.text_to_speech("Hello there.", out_path, preprocessed=True) == out_path
+    finally:
+        for name, value in saved.items():
+            setattr(tts, name, value)
+        torch.cuda.empty_cache = saved_empty_cache
+
+    assert calls == {"synthesize": 2, "empty_cache": 1}
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_cloned_path_retries_after_oom(Path(tmp))
+    print("✅ XTTS path retries after CUDA OOM")